@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        import api.authentication  # noqa: F401
+        from api.cache import CATALOG_MODELS, catalog_object_changed
+        from django.db.models.signals import post_delete, post_save
+
+        # Только модели каталога: приёмник post_delete без sender
+        # отключил бы быстрое удаление у всех моделей.
+        for model in CATALOG_MODELS:
+            post_save.connect(catalog_object_changed, sender=model)
+            post_delete.connect(catalog_object_changed, sender=model)
@@ -0,0 +1,91 @@
+from api.cache import get_cache
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import User
+
+SNAPSHOT_FIELDS = (
+    "id", "username", "role", "is_staff", "is_superuser", "is_active",
+)
+# Ключи в токене не должны совпадать со стандартными claims.
+TOKEN_CLAIMS = {
+    field: f"u_{field}" for field in SNAPSHOT_FIELDS if field != "id"
+}
+
+
+def snapshot_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def make_access_token(user):
+    """
+    Выдаёт access-токен; при JWT_EMBED_USER_CLAIMS кладёт в него роль,
+    чтобы аутентификация не обращалась ни к базе, ни к кэшу.
+    """
+    token = AccessToken.for_user(user)
+    if settings.JWT_EMBED_USER_CLAIMS:
+        for field, claim in TOKEN_CLAIMS.items():
+            token[claim] = getattr(user, field)
+    return token
+
+
+def user_from_snapshot(snapshot):
+    user = User(**snapshot)
+    user._state.adding = False
+    user._state.db = "default"
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса пользователя к базе на каждый запрос.
+
+    Нужные для проверки прав поля пользователя берутся из токена, если
+    они там есть, иначе из кэша на AUTH_USER_CACHE_TIMEOUT секунд.
+    Кэш сбрасывается при сохранении и удалении пользователя.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or not all(
+            claim in validated_token for claim in TOKEN_CLAIMS.values()
+        ):
+            snapshot = self.get_snapshot(validated_token)
+        else:
+            snapshot = {
+                field: validated_token[claim]
+                for field, claim in TOKEN_CLAIMS.items()
+            }
+            snapshot["id"] = user_id
+        if not snapshot["is_active"]:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        return user_from_snapshot(snapshot)
+
+    def get_snapshot(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        cache = get_cache()
+        snapshot = cache.get(snapshot_cache_key(user_id))
+        if snapshot is None:
+            user = super().get_user(validated_token)
+            snapshot = {
+                field: getattr(user, field) for field in SNAPSHOT_FIELDS
+            }
+            cache.set(
+                snapshot_cache_key(user.pk),
+                snapshot,
+                settings.AUTH_USER_CACHE_TIMEOUT,
+            )
+        return snapshot
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    get_cache().delete(snapshot_cache_key(instance.pk))
@@ -0,0 +1,92 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_migrate
+from django.dispatch import receiver
+from reviews.models import Category, Genre, Review, Title
+
+CATALOG_MODELS = (Genre, Category, Title, Review)
+VERSION_KEY = 'catalog:version'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_version_cache():
+    return caches[settings.CATALOG_VERSION_CACHE_ALIAS]
+
+
+def version_timeout():
+    """Версия живёт не дольше закэшированных по ней ответов."""
+    return get_cache().default_timeout
+
+
+def get_catalog_version():
+    """
+    Возвращает время последнего изменения каталога.
+
+    Оно входит в ключ и ETag каждого ответа, поэтому после записи старые
+    ответы просто перестают находиться и вытесняются по LRU или TTL.
+    Версия хранится в общем для всех процессов кэше
+    CATALOG_VERSION_CACHE_ALIAS и истекает вместе с ответами: тогда
+    выдаётся новая версия, и старый ETag перестаёт подходить.
+    """
+    cache = get_version_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time(), timeout=version_timeout())
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    get_version_cache().set(
+        VERSION_KEY, time.time(), timeout=version_timeout()
+    )
+
+
+def invalidate_catalog(**kwargs):
+    """
+    Меняет версию каталога после фиксации текущей транзакции.
+
+    Если сменить версию раньше, параллельный запрос успеет закэшировать
+    под новой версией ещё старые данные, а при откате транзакции кэш
+    сбросится впустую. Вне транзакции версия меняется сразу.
+    """
+    transaction.on_commit(bump_catalog_version)
+
+
+def request_fingerprint(request, view, *parts):
+    """
+    Хэш всего, от чего зависит тело ответа: пути, параметров запроса,
+    классов доступа, формата и переданных версий данных.
+    """
+    permissions = ','.join(
+        type(permission).__name__ for permission in view.get_permissions()
+    )
+    query = '&'.join(sorted(request.GET.urlencode().split('&')))
+    raw = '|'.join(map(str, (
+        request.path,
+        query,
+        permissions,
+        request.accepted_renderer.format,
+        *parts,
+    )))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def catalog_object_changed(sender, **kwargs):
+    invalidate_catalog()
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_catalog()
+
+
+post_migrate.connect(invalidate_catalog)
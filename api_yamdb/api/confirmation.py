@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import base36_to_int, int_to_base36
+
+KEY_SALT = 'api.confirmation.ConfirmationCode'
+
+
+def _signature(user, timestamp):
+    return salted_hmac(
+        KEY_SALT, f'{user.pk}:{user.email}:{timestamp}'
+    ).hexdigest()[:20]
+
+
+def make_confirmation_code(user, timestamp=None):
+    """
+    Код подтверждения: время выдачи и HMAC от id, email и этого времени.
+
+    Код ничего не хранит в базе: он проверяется пересчётом подписи
+    и перестаёт действовать через CONFIRMATION_CODE_TIMEOUT секунд
+    или после смены email.
+    """
+    if timestamp is None:
+        timestamp = int(time.time())
+    return f'{int_to_base36(timestamp)}-{_signature(user, timestamp)}'
+
+
+def check_confirmation_code(user, code):
+    try:
+        timestamp_b36, signature = str(code).split('-', 1)
+        timestamp = base36_to_int(timestamp_b36)
+    except ValueError:
+        return False
+    if time.time() - timestamp > settings.CONFIRMATION_CODE_TIMEOUT:
+        return False
+    return constant_time_compare(signature, _signature(user, timestamp))
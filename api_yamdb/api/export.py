@@ -0,0 +1,87 @@
+"""
+Потоковая выгрузка таблиц в CSV и NDJSON.
+
+Строки читаются из базы итератором порциями по EXPORT_CHUNK_SIZE и сразу
+отдаются клиенту, поэтому память не растёт с размером таблицы. Имена
+таблиц и колонки CSV совпадают с файлами команды load_to_database,
+и выгрузку можно загрузить обратно без изменений.
+"""
+import csv
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+# Таблица: (модель, колонки). Колонка — имя поля или пара
+# (заголовок, поле), если заголовок в файле отличается от поля модели.
+EXPORTS = {
+    'users': (User, (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name',
+    )),
+    'category': (Category, ('id', 'name', 'slug')),
+    'genre': (Genre, ('id', 'name', 'slug')),
+    'titles': (Title, (
+        'id', 'name', 'year', ('category', 'category_id'), 'description',
+        'rating', 'reviews_count',
+    )),
+    'genre_title': (Title.genre.through, ('id', 'title_id', 'genre_id')),
+    'review': (Review, (
+        'id', 'title_id', 'text', ('author', 'author_id'), 'score',
+        'pub_date',
+    )),
+    'comments': (Comment, (
+        'id', 'review_id', 'text', ('author', 'author_id'), 'pub_date',
+    )),
+}
+
+
+class Echo:
+    """Файлоподобный объект для csv.writer, возвращающий строку."""
+
+    def write(self, value):
+        return value
+
+
+def get_columns(table):
+    model, columns = EXPORTS[table]
+    headers, fields = zip(*(
+        column if isinstance(column, tuple) else (column, column)
+        for column in columns
+    ))
+    return model, headers, fields
+
+
+def iter_rows(table):
+    model, headers, fields = get_columns(table)
+    rows = model.objects.order_by('pk').values_list(*fields).iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE
+    )
+    return headers, rows
+
+
+def iter_csv(table):
+    headers, rows = iter_rows(table)
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row
+        )
+
+
+def iter_ndjson(table):
+    headers, rows = iter_rows(table)
+    for row in rows:
+        yield json.dumps(
+            dict(zip(headers, row)), cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
+
+
+# Формат: (Content-Type, генератор строк).
+FORMATS = {
+    'csv': ('text/csv; charset=utf-8', iter_csv),
+    'ndjson': ('application/x-ndjson; charset=utf-8', iter_ndjson),
+}
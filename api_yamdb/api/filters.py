@@ -1,16 +1,18 @@
-from django_filters import CharFilter, FilterSet
-from reviews.models import Title
+from django.db.models import Exists, OuterRef
+from django_filters import BaseInFilter, CharFilter, FilterSet
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+from reviews.models import Category, Genre, Title
+from reviews.search import get_search_backend
+
+
+class SlugInFilter(BaseInFilter, CharFilter):
+    """Точное совпадение с одним или несколькими slug через запятую."""
 
 
 class TitleFilter(FilterSet):
-    genre = CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
-    category = CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
+    genre = SlugInFilter(method='filter_genre')
+    category = SlugInFilter(method='filter_category')
     name = CharFilter(
         field_name='name',
         lookup_expr='icontains'
@@ -19,3 +21,36 @@ class TitleFilter(FilterSet):
     class Meta:
         model = Title
         fields = ('name', 'year', 'genre', 'category',)
+
+    def filter_genre(self, queryset, name, value):
+        genre_ids = list(
+            Genre.objects.filter(slug__in=value).values_list('pk', flat=True)
+        )
+        if not genre_ids:
+            return queryset.none()
+        # EXISTS вместо JOIN: произведение с несколькими подходящими
+        # жанрами не дублируется и DISTINCT не нужен.
+        return queryset.annotate(
+            has_genre=Exists(Title.genre.through.objects.filter(
+                title=OuterRef('pk'), genre_id__in=genre_ids,
+            ))
+        ).filter(has_genre=True)
+
+    def filter_category(self, queryset, name, value):
+        category_ids = list(
+            Category.objects.filter(slug__in=value)
+            .values_list('pk', flat=True)
+        )
+        return queryset.filter(category_id__in=category_ids)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Поиск по названию через полнотекстовый индекс, по релевантности."""
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, "").strip()
+        if not query:
+            return queryset
+        return get_search_backend().search(queryset, query)
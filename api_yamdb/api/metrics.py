@@ -0,0 +1,186 @@
+"""
+Метрики запросов к API по имени маршрута (например, `api:titles-list`):
+время ответа, число и время запросов к базе, размер ответа.
+
+Значения собираются в памяти процесса в гистограммы с общими для всех
+маршрутов границами корзин и отдаются в текстовом формате Prometheus.
+Если задан METRICS_DUMP_PATH, снимок метрик раз в METRICS_DUMP_INTERVAL
+секунд дописывается в файл строкой JSON.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+PREFIX = 'yamdb_'
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+# Метрика: (описание, границы корзин).
+METRICS = {
+    'request_duration_seconds': ('Время ответа', DURATION_BUCKETS),
+    'db_queries': ('Число запросов к базе за ответ', QUERY_BUCKETS),
+    'db_duration_seconds': ('Время запросов к базе', DURATION_BUCKETS),
+    'response_size_bytes': ('Размер тела ответа', SIZE_BUCKETS),
+}
+UNRESOLVED_ROUTE = 'unresolved'
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # Последняя корзина — значения больше всех границ (+Inf).
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def as_dict(self):
+        cumulative, total = [], 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return {
+            'buckets': dict(zip(
+                [*map(str, self.buckets), '+Inf'], cumulative
+            )),
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+class MetricsRegistry:
+    """Гистограммы по маршрутам; все изменения идут под блокировкой."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.routes = {}
+            self.dumped_at = time.monotonic()
+
+    def observe(self, route, **values):
+        with self.lock:
+            histograms = self.routes.get(route)
+            if histograms is None:
+                histograms = self.routes[route] = {
+                    name: Histogram(buckets)
+                    for name, (_, buckets) in METRICS.items()
+                }
+            for name, value in values.items():
+                histograms[name].observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                route: {
+                    name: histogram.as_dict()
+                    for name, histogram in histograms.items()
+                }
+                for route, histograms in self.routes.items()
+            }
+
+    def render_prometheus(self):
+        snapshot = self.snapshot()
+        lines = []
+        for name, (description, _) in METRICS.items():
+            metric = PREFIX + name
+            lines += [
+                f'# HELP {metric} {description}',
+                f'# TYPE {metric} histogram',
+            ]
+            for route, metrics in sorted(snapshot.items()):
+                label = route.replace('\\', '\\\\').replace('"', '\\"')
+                histogram = metrics[name]
+                for bound, count in histogram['buckets'].items():
+                    lines.append(
+                        f'{metric}_bucket{{route="{label}",le="{bound}"}} '
+                        f'{count}'
+                    )
+                lines += [
+                    f'{metric}_sum{{route="{label}"}} {histogram["sum"]}',
+                    f'{metric}_count{{route="{label}"}} '
+                    f'{histogram["count"]}',
+                ]
+        return '\n'.join(lines) + '\n'
+
+    def dump_if_due(self):
+        path = settings.METRICS_DUMP_PATH
+        if not path:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if now - self.dumped_at < settings.METRICS_DUMP_INTERVAL:
+                return
+            self.dumped_at = now
+        line = json.dumps({
+            'time': timezone.now().isoformat(),
+            'routes': self.snapshot(),
+        }, ensure_ascii=False)
+        with open(path, 'a', encoding='utf-8') as dump:
+            dump.write(line + '\n')
+
+
+registry = MetricsRegistry()
+
+
+class QueryCounter:
+    """execute_wrapper, считающий запросы к базе и их время."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+class RequestMetricsMiddleware:
+    """
+    Записывает метрики каждого запроса в registry.
+
+    У потоковых ответов (выгрузка) учитывается только подготовка ответа:
+    тело отдаётся уже после выхода из middleware, и его размер неизвестен.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        values = {
+            'request_duration_seconds': time.perf_counter() - started,
+            'db_queries': counter.count,
+            'db_duration_seconds': counter.duration,
+        }
+        if not response.streaming:
+            values['response_size_bytes'] = len(response.content)
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else UNRESOLVED_ROUTE, **values
+        )
+        registry.dump_if_due()
+        return response
@@ -1,4 +1,51 @@
-from rest_framework import mixins, viewsets
+from api.cache import get_cache, get_catalog_version, request_fingerprint
+from api.serializers import get_query_list
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from reviews.models import Review, Title, User
+
+BULK_MAX_ITEMS = 1000
+
+
+def bulk_insert(model, objs, batch_size=500, natural_key=None):
+    """
+    bulk_create, после которого у всех объектов заполнен pk.
+
+    PostgreSQL возвращает id из bulk_create сам. Иначе id ищутся по
+    natural_key — полям уникального ограничения модели. Без такого ключа
+    id отсчитываются от максимального: вставка и чтение идут в одной
+    транзакции, а SQLite держит блокировку записи от первого INSERT до
+    фиксации, поэтому параллельные вставки не вклиниваются между ними.
+    """
+    with transaction.atomic():
+        model.objects.bulk_create(objs, batch_size=batch_size)
+        if not objs or objs[0].pk is not None:
+            return objs
+        if natural_key is not None:
+            pks = {
+                tuple(row[:-1]): row[-1]
+                for row in model.objects.filter(**{
+                    f"{field}__in": {getattr(obj, field) for obj in objs}
+                    for field in natural_key
+                }).values_list(*natural_key, "pk")
+            }
+            for obj in objs:
+                obj.pk = pks[tuple(getattr(obj, f) for f in natural_key)]
+            return objs
+        last_id = model.objects.aggregate(last_id=Max("pk"))["last_id"]
+        for pk, obj in enumerate(objs, last_id - len(objs) + 1):
+            obj.pk = pk
+    return objs
 
 
 class CreateListDestroyMixins(mixins.CreateModelMixin,
@@ -7,3 +54,295 @@ class CreateListDestroyMixins(mixins.CreateModelMixin,
                               viewsets.GenericViewSet
                               ):
     pass
+
+
+class ConditionalListMixin:
+    """
+    Отвечает 304 на list, если клиент прислал актуальный ETag.
+
+    Валидаторы считаются в get_conditional_validators без сериализации
+    ответа, поэтому неизменившаяся страница обходится без запроса данных.
+    """
+
+    def get_conditional_validators(self, request):
+        """Возвращает пару (etag, last_modified)."""
+        return None, None
+
+    def get_vary_headers(self, request):
+        """Заголовки запроса, от которых зависит тело ответа."""
+        return ()
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_conditional_validators(request)
+        if etag is None and last_modified is None:
+            return handler(request, *args, **kwargs)
+        vary = self.get_vary_headers(request)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            patch_vary_headers(not_modified, vary)
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            if etag is not None:
+                response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            patch_vary_headers(response, vary)
+        return response
+
+
+class ConditionalResponseMixin(ConditionalListMixin):
+    """Отвечает 304 на list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class NestedResourceMixin:
+    """
+    Родительские объекты вложенных маршрутов titles/reviews/comments.
+
+    Цепочка произведение → отзыв загружается одним запросом с JOIN
+    и запоминается на время запроса. Отзыв ищется только среди отзывов
+    произведения из URL, иначе 404.
+    """
+
+    def get_title(self):
+        if not hasattr(self, "_title"):
+            if "review_id" in self.kwargs:
+                self.get_review()
+            else:
+                self._title = get_object_or_404(
+                    Title, id=self.kwargs.get("title_id")
+                )
+        return self._title
+
+    def get_review(self):
+        if not hasattr(self, "_review"):
+            self._review = get_object_or_404(
+                Review.objects.select_related("title"),
+                id=self.kwargs.get("review_id"),
+                title_id=self.kwargs.get("title_id"),
+            )
+            self._title = self._review.title
+        return self._review
+
+
+class ReviewsVersionMixin(NestedResourceMixin, ConditionalResponseMixin):
+    """
+    Валидаторы для отзывов и комментариев к произведению.
+
+    ETag строится из счётчика Title.reviews_version, который растёт при
+    любом изменении отзывов и комментариев к произведению. Если в ответ
+    входят поля, зависящие от пользователя (`?expand=can_edit`), в ETag
+    добавляются id и роль пользователя, а ответ помечается
+    `Vary: Authorization`.
+    """
+
+    def is_user_dependent(self, request):
+        expandable = self.get_serializer_class().expandable_fields
+        return any(
+            getattr(expandable.get(name), "user_dependent", False)
+            for name in get_query_list(request, "expand")
+        )
+
+    def get_conditional_validators(self, request):
+        parts = [self.get_title().reviews_version]
+        if self.is_user_dependent(request):
+            parts += [request.user.id, getattr(request.user, "role", None)]
+        return f'"{request_fingerprint(request, self, *parts)}"', None
+
+    def get_vary_headers(self, request):
+        if self.is_user_dependent(request):
+            return ("Authorization",)
+        return ()
+
+
+class CachedListMixin(ConditionalListMixin):
+    """
+    Кэширует ответы list до следующего изменения каталога.
+
+    ETag и Last-Modified берутся из версии каталога, так что повторный
+    запрос клиента получает 304 без обращения к кэшу.
+    """
+
+    def get_conditional_validators(self, request):
+        version = get_catalog_version()
+        self.catalog_key = request_fingerprint(request, self, version)
+        return f'"{self.catalog_key}"', int(version)
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        def cached_handler(request, *args, **kwargs):
+            cache = get_cache()
+            key = f'catalog:{self.catalog_key}'
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data)
+            return response
+
+        return super().conditional_response(
+            cached_handler, request, *args, **kwargs
+        )
+
+
+class CachedResponseMixin(CachedListMixin, ConditionalResponseMixin):
+    """Кэширует ответы list и retrieve."""
+
+
+class BulkCreateMixin:
+    """
+    POST <список>/bulk/ — создание списка объектов одним запросом.
+
+    Все элементы проверяются сериализатором с many=True, а записываются
+    в perform_bulk_create одной транзакцией. В ответе для каждого
+    элемента свой статус: 201 с данными объекта или 400 с ошибками.
+    Если запись нарушила ограничение базы, ответ — 400 для всей пачки
+    с сообщением bulk_conflict_message.
+    """
+
+    bulk_conflict_message = "Объекты конфликтуют с уже сохранёнными."
+
+    @action(detail=False, methods=("POST",), url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        if not isinstance(request.data, list) or not request.data:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                "Ожидается непустой список объектов."
+            ]})
+        if len(request.data) > BULK_MAX_ITEMS:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f"Не больше {BULK_MAX_ITEMS} объектов за запрос."
+            ]})
+        context = self.get_serializer_context()
+        context.update(self.get_bulk_context(request.data))
+        serializer = self.get_serializer_class()(
+            data=request.data, many=True, context=context
+        )
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                results = self.perform_bulk_create(
+                    serializer.validated_data
+                )
+        except IntegrityError:
+            # Параллельный запрос успел записать конфликтующий объект
+            # после проверки: пачка откатывается целиком.
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                self.bulk_conflict_message
+            ]})
+        results = [
+            result if isinstance(result, dict)
+            else {"status": status.HTTP_201_CREATED,
+                  "data": self.get_serializer(result).data}
+            for result in results
+        ]
+        created = all(
+            result["status"] == status.HTTP_201_CREATED for result in results
+        )
+        return Response(
+            results,
+            status=status.HTTP_201_CREATED if created
+            else status.HTTP_207_MULTI_STATUS,
+        )
+
+    def get_bulk_context(self, data):
+        return {}
+
+    def perform_bulk_create(self, items):
+        """
+        Возвращает по одному результату на элемент: созданный объект
+        или готовый словарь с ошибкой (см. bulk_error).
+
+        По умолчанию объекты модели сериализатора создаются как есть;
+        связи many-to-many и счётчики обновляются в переопределениях.
+        """
+        model = self.get_serializer_class().Meta.model
+        return bulk_insert(model, [model(**data) for data in items])
+
+    @staticmethod
+    def bulk_error(errors):
+        return {"status": status.HTTP_400_BAD_REQUEST, "errors": errors}
+
+    def get_bulk_authors(self):
+        """
+        Авторы элементов: администратор может передать `author` (username)
+        для загрузки чужих отзывов, остальные пишут от своего имени.
+        Возвращает список, где вместо неизвестного автора стоит None.
+        """
+        user = self.request.user
+        if not user.is_admin:
+            return [user] * len(self.request.data)
+        usernames = {
+            item.get("author") for item in self.request.data
+            if isinstance(item, dict) and item.get("author")
+        }
+        users = {
+            author.username: author
+            for author in User.objects.filter(
+                username__in=usernames
+            ).only("id", "username")
+        } if usernames else {}
+        return [
+            users.get(item["author"]) if item.get("author") else user
+            for item in self.request.data
+        ]
+
+
+class SparseQuerysetMixin:
+    """
+    При `?fields=` загружает из базы только колонки полей ответа.
+
+    Связи, не попавшие в ответ, не присоединяются и не подгружаются:
+    select_related и prefetch_related queryset сбрасываются и строятся
+    заново по полям сериализатора. Колонки из sparse_required_fields
+    загружаются всегда (например, поля сортировки для курсора).
+    """
+
+    sparse_required_fields = ()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if (self.request.method not in SAFE_METHODS
+                or "fields" not in self.request.query_params):
+            return queryset
+        return self.restrict_queryset(queryset)
+
+    def restrict_queryset(self, queryset):
+        model = queryset.model
+        only = {model._meta.pk.name, *self.sparse_required_fields}
+        select_related, prefetch_related = [], []
+        for field in self.get_serializer().fields.values():
+            if hasattr(field, "model_fields"):
+                only.update(field.model_fields)
+                continue
+            if not field.source_attrs:
+                continue
+            name = field.source_attrs[0]
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if model_field.many_to_many:
+                prefetch_related.append(name)
+                continue
+            only.add(name)
+            if model_field.many_to_one:
+                select_related.append(name)
+        queryset = queryset.select_related(None).prefetch_related(
+            None
+        ).prefetch_related(*prefetch_related).only(*only)
+        # select_related() без аргументов присоединил бы все связи.
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        return queryset
@@ -0,0 +1,43 @@
+from collections import OrderedDict
+
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class FeedCursorPagination(CursorPagination):
+    ordering = ("-pub_date", "-id")
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class FeedPagination(LimitOffsetPagination):
+    """
+    Пагинация лент отзывов и комментариев.
+
+    По умолчанию работает как limit/offset. Если в запросе есть параметр
+    `cursor` (для первой страницы — пустой), страницы выбираются по
+    курсору: стоимость запроса не зависит от глубины пролистывания,
+    а COUNT(*) выполняется только при `count=true`.
+    """
+
+    cursor_class = FeedCursorPagination
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = None
+        if self.cursor_class.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor = self.cursor_class()
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "true":
+            self.count = self.get_count(queryset)
+        return self.cursor.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor is None:
+            return super().get_paginated_response(data)
+        response = self.cursor.get_paginated_response(data)
+        if self.count is not None:
+            response.data = OrderedDict(
+                count=self.count, **response.data
+            )
+        return response
@@ -15,6 +15,27 @@ class IsAdmin(permissions.BasePermission):
         return request.user.is_authenticated and request.user.is_admin
 
 
+class EditChecker:
+    """
+    Право изменять отзывы и комментарии.
+
+    Решение принимается по obj.author_id и id и роли пользователя из
+    запроса, без загрузки автора. Роль вычисляется один раз, поэтому
+    одним экземпляром можно проверить всю страницу объектов.
+    """
+
+    def __init__(self, user):
+        self.user_id = user.id if user.is_authenticated else None
+        self.is_staff = user.is_authenticated and (
+            user.is_admin or user.is_moderator
+        )
+
+    def __call__(self, obj):
+        return self.is_staff or (
+            self.user_id is not None and obj.author_id == self.user_id
+        )
+
+
 class IsAuthorOrIsStaff(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
@@ -25,7 +46,5 @@ class IsAuthorOrIsStaff(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return (
             request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
-            or request.user.is_admin
-            or request.user.is_moderator
+            or EditChecker(request.user)(obj)
         )
@@ -0,0 +1,211 @@
+"""
+Профилирование отдельных запросов к API.
+
+Администратор включает его параметром `?__profile=cprofile` или
+заголовком `X-Profile: cprofile` и вместо ответа получает отчёт:
+самые дорогие функции по cProfile, хронологию запросов к базе и время
+сериализации по полям. Кроме того, доля PROFILE_SAMPLE_RATE обычных
+запросов профилируется незаметно для клиента, а отчёты сохраняются
+в PROFILE_DIR. Без параметра и с нулевой долей middleware только
+проверяет путь, параметр и заголовок: сериализаторы и соединения
+с базой ничем не обёрнуты.
+"""
+import cProfile
+import json
+import os
+import pstats
+import random
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack
+
+from api.authentication import CachedJWTAuthentication
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+PROFILE_PARAM = '__profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_MODE = 'cprofile'
+PROFILED_PATH_PREFIX = '/api/v1/'
+
+
+class FieldTimer:
+    """Время получения и сериализации значений по полям сериализаторов."""
+
+    def __init__(self):
+        self.fields = defaultdict(lambda: [0, 0])
+
+    def wrap(self, serializer, name, field):
+        entry = self.fields[(type(serializer).__name__, name)]
+
+        def timed(method):
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    entry[0] += 1
+                    entry[1] += time.perf_counter() - started
+            return wrapper
+
+        # Атрибуты экземпляра: поля копируются для каждого сериализатора,
+        # поэтому другие запросы обёрток не видят.
+        field.get_attribute = timed(field.get_attribute)
+        field.to_representation = timed(field.to_representation)
+
+    def report(self):
+        return [
+            {
+                'serializer': serializer,
+                'field': name,
+                'calls': calls,
+                'total_ms': seconds * 1000,
+            }
+            for (serializer, name), (calls, seconds) in sorted(
+                self.fields.items(), key=lambda item: -item[1][1]
+            )
+        ]
+
+
+class FieldTimingMixin:
+    """Замеряет поля сериализатора, если запрос профилируется."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        timer = getattr(self.context.get("request"), "field_timer", None)
+        if timer is not None:
+            for name, field in fields.items():
+                timer.wrap(self, name, field)
+        return fields
+
+
+class QueryTimeline:
+    """execute_wrapper, записывающий время начала и длительность запросов."""
+
+    def __init__(self, started):
+        self.started = started
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'start_ms': (started - self.started) * 1000,
+                'duration_ms': (time.perf_counter() - started) * 1000,
+                'sql': sql,
+            })
+
+
+def is_admin_request(request):
+    try:
+        authenticated = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return authenticated is not None and authenticated[0].is_admin
+
+
+def top_functions(profiler, limit):
+    stats = pstats.Stats(profiler).stats
+    rows = sorted(stats.items(), key=lambda item: -item[1][3])[:limit]
+    return [
+        {
+            'function': f'{filename}:{line}({name})',
+            'calls': calls,
+            'total_ms': total * 1000,
+            'cumulative_ms': cumulative * 1000,
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _)
+        in rows
+    ]
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует запрос к API по просьбе администратора или по выборке.
+
+    Отчёт по явному запросу возвращается вместо ответа представления,
+    отчёт по выборке сохраняется в PROFILE_DIR, а клиент получает
+    обычный ответ.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not request.path.startswith(PROFILED_PATH_PREFIX):
+            return self.get_response(request)
+        requested = (
+            request.GET.get(PROFILE_PARAM) == PROFILE_MODE
+            or request.META.get(PROFILE_HEADER) == PROFILE_MODE
+        )
+        if requested:
+            if not is_admin_request(request):
+                return self.get_response(request)
+        elif not (
+            settings.PROFILE_SAMPLE_RATE
+            and random.random() < settings.PROFILE_SAMPLE_RATE
+        ):
+            return self.get_response(request)
+
+        result = self.profile(request)
+        if result is None:
+            # Профилировщик уже занят: в потоке работает другой.
+            return self.get_response(request)
+        response, report = result
+        if requested:
+            return JsonResponse(
+                report, json_dumps_params={'ensure_ascii': False}
+            )
+        self.store(report)
+        return response
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None
+        profiler.disable()
+        request.field_timer = FieldTimer()
+        started = time.perf_counter()
+        timeline = QueryTimeline(started)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timeline))
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        match = request.resolver_match
+        report = {
+            'time': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.get_full_path(),
+            'route': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': (time.perf_counter() - started) * 1000,
+            'functions': top_functions(
+                profiler, settings.PROFILE_TOP_FUNCTIONS
+            ),
+            'queries': timeline.queries,
+            'serializer_fields': request.field_timer.report(),
+        }
+        return response, report
+
+    def store(self, report):
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        name = '{}-{}-{}.json'.format(
+            timezone.now().strftime('%Y%m%d%H%M%S'),
+            (report['route'] or 'unresolved').replace(':', '_'),
+            uuid.uuid4().hex[:8],
+        )
+        with open(os.path.join(settings.PROFILE_DIR, name), 'w',
+                  encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
@@ -1,37 +1,124 @@
 import datetime
 
+from api.permissions import EditChecker
+from api.profiling import FieldTimingMixin
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
 from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
 from reviews.errors import ErrorMesage
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (HISTOGRAM_FIELDS, SCORES, Category, Comment, Genre,
+                            Review, Title, User)
 from reviews.validators import validate_username
 
 
-class GenreSerializer(serializers.ModelSerializer):
+def get_query_list(request, name):
+    """Значения параметра запроса через запятую: ?fields=id,name."""
+    return [value for value in request.query_params.get(name, "").split(",")
+            if value]
+
+
+class SparseFieldsMixin:
+    """
+    Поля ответа по параметрам запроса на чтение.
+
+    `?fields=id,name` оставляет только перечисленные поля,
+    `?expand=histogram` добавляет необязательные поля из
+    expandable_fields. Неизвестные имена пропускаются.
+    """
+
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request is None or request.method not in SAFE_METHODS:
+            return fields
+        expand = [
+            name for name in get_query_list(request, "expand")
+            if name in self.expandable_fields
+        ]
+        for name in expand:
+            fields[name] = self.expandable_fields[name]()
+        only = get_query_list(request, "fields")
+        if only:
+            for name in list(fields):
+                if name not in only and name not in expand:
+                    del fields[name]
+        return fields
+
+
+class GenreSerializer(FieldTimingMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ("name", "slug")
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(FieldTimingMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ("name", "slug")
 
 
-class CategoryField(serializers.SlugRelatedField):
-    def to_representation(self, value):
-        serializer = CategorySerializer(value)
-        return serializer.data
+class NestedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Принимает slug, а отдаёт объект с полями из `fields`.
+
+    Объект собирается напрямую из атрибутов модели, без создания
+    вложенного сериализатора на каждую связанную запись.
+    """
+
+    fields = ()
 
+    def to_internal_value(self, data):
+        # При массовом создании объекты по slug загружены заранее
+        # одним запросом и переданы в контексте.
+        objects = self.context.get("related_objects", {}).get(
+            self.queryset.model
+        )
+        if objects is None:
+            return super().to_internal_value(data)
+        try:
+            return objects[data]
+        except KeyError:
+            self.fail(
+                "does_not_exist", slug_name=self.slug_field, value=data
+            )
+        except TypeError:
+            self.fail("invalid")
 
-class GenreField(serializers.SlugRelatedField):
     def to_representation(self, value):
-        serializer = GenreSerializer(value)
-        return serializer.data
+        return {field: getattr(value, field) for field in self.fields}
+
+
+class CategoryField(NestedSlugRelatedField):
+    fields = CategorySerializer.Meta.fields
+
+
+class GenreField(NestedSlugRelatedField):
+    fields = GenreSerializer.Meta.fields
+
+
+class HistogramField(serializers.Field):
+    """Гистограмма оценок: {"1": число отзывов с оценкой 1, ...}."""
+
+    # Колонки, которые нужно загрузить для поля (см. SparseQuerysetMixin).
+    model_fields = HISTOGRAM_FIELDS
+
+    def __init__(self, **kwargs):
+        kwargs.update(source="*", read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, title):
+        return {
+            str(score): getattr(title, field)
+            for score, field in zip(SCORES, HISTOGRAM_FIELDS)
+        }
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(FieldTimingMixin, SparseFieldsMixin,
+                      serializers.ModelSerializer):
     category = CategoryField(
         slug_field="slug", queryset=Category.objects.all(), required=False
     )
@@ -39,9 +126,14 @@ class TitleSerializer(serializers.ModelSerializer):
                        many=True)
     rating = serializers.FloatField(read_only=True)
 
+    expandable_fields = {"histogram": HistogramField}
+
     class Meta:
         model = Title
-        fields = "__all__"
+        exclude = (
+            "reviews_count", "score_sum", "reviews_version", "weighted_rating",
+            *HISTOGRAM_FIELDS,
+        )
 
     def validate_year(self, value):
         year = datetime.date.today().year
@@ -50,7 +142,20 @@ class TitleSerializer(serializers.ModelSerializer):
         return value
 
 
-class UserSerializer(serializers.ModelSerializer):
+class TopTitleSerializer(TitleSerializer):
+    weighted_rating = serializers.FloatField(read_only=True)
+    reviews_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TitleSerializer.Meta):
+        exclude = ("score_sum", "reviews_version", *HISTOGRAM_FIELDS)
+
+
+class TopTitlesQuerySerializer(serializers.Serializer):
+    min_reviews = serializers.IntegerField(min_value=1, default=1)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+
+class UserSerializer(FieldTimingMixin, serializers.ModelSerializer):
     username = serializers.CharField(
         required=True,
         max_length=150,
@@ -84,36 +189,64 @@ class TokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True, max_length=150)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class CanEditField(serializers.Field):
+    """Может ли текущий пользователь изменить или удалить объект."""
+
+    model_fields = ("author",)
+    # Значение зависит от пользователя: см. ReviewsVersionMixin.
+    user_dependent = True
+
+    def __init__(self, **kwargs):
+        kwargs.update(source="*", read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        # Один EditChecker на весь ответ: роль пользователя вычисляется
+        # один раз, а объекты проверяются по author_id без запросов.
+        if "edit_checker" not in self.context:
+            self.context["edit_checker"] = EditChecker(
+                self.context["request"].user
+            )
+        return self.context["edit_checker"](obj)
+
+
+class ReviewSerializer(FieldTimingMixin, SparseFieldsMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field="username",
     )
 
+    expandable_fields = {"can_edit": CanEditField}
+
     class Meta:
         model = Review
         exclude = ("title",)
         read_only_fields = ("pub_date",)
 
-    def validate(self, data):
-        if self.context["request"].method != "POST":
-            return data
-
-        title_id = self.context["view"].kwargs.get("title_id")
-        author = self.context["request"].user
-
-        if Review.objects.filter(author=author, title=title_id).exists():
-            raise serializers.ValidationError(ErrorMesage.ONLY_ONE_REVIEW)
-
-        return data
-
-
-class CommentSerializer(serializers.ModelSerializer):
+    def create(self, validated_data):
+        # Уникальность отзыва проверяет ограничение unique_title_author,
+        # отдельный запрос EXISTS перед вставкой не нужен.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [
+                    ErrorMesage.ONLY_ONE_REVIEW
+                ]}
+            )
+
+
+class CommentSerializer(FieldTimingMixin, SparseFieldsMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field="username",
     )
 
+    expandable_fields = {"can_edit": CanEditField}
+
     class Meta:
         model = Comment
         exclude = ("review",)
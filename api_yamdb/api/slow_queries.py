@@ -0,0 +1,163 @@
+"""
+Журнал медленных запросов к базе.
+
+Включается настройкой SLOW_QUERY_THRESHOLD (в секундах). Каждый запрос
+дольше порога записывается строкой JSON в SLOW_QUERY_LOG_PATH вместе
+с параметрами, маршрутом и ближайшим кадром стека из кода проекта.
+Файл ротируется по размеру, а сводку по нему строит команда
+`python manage.py slow_queries`.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+logger.propagate = False
+_handler_lock = threading.Lock()
+_handler_path = None
+
+IN_LIST = re.compile(r'\bIN \((?:\s*%s\s*,)*\s*%s\s*\)')
+NUMBER = re.compile(r'\b\d+\b')
+STRING = re.compile(r"'(?:[^']|'')*'")
+SPACES = re.compile(r'\s+')
+# Модули с обёртками запросов, которые не считаются источником запроса.
+INSTRUMENTATION_MODULES = ('api.metrics', __name__)
+
+
+def fingerprint(sql):
+    """SQL без значений: списки IN и литералы заменены заглушками."""
+    sql = IN_LIST.sub('IN (...)', sql)
+    sql = STRING.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def get_logger():
+    """Логгер с обработчиком для текущего SLOW_QUERY_LOG_PATH."""
+    global _handler_path
+    path = settings.SLOW_QUERY_LOG_PATH
+    with _handler_lock:
+        if path != _handler_path:
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+                handler.close()
+            logger.addHandler(RotatingFileHandler(
+                path,
+                maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+                encoding='utf-8',
+            ))
+            logger.setLevel(logging.WARNING)
+            _handler_path = path
+    return logger
+
+
+def app_frame():
+    """
+    Ближайший к запросу кадр стека из кода проекта: путь относительно
+    BASE_DIR и имя функции с классом.
+    """
+    base_dir = str(settings.BASE_DIR) + os.sep
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(base_dir)
+                and 'site-packages' not in filename
+                and frame.f_globals.get('__name__')
+                not in INSTRUMENTATION_MODULES):
+            code = frame.f_code
+            name = getattr(code, 'co_qualname', None)
+            if name is None:
+                owner = frame.f_locals.get('self', frame.f_locals.get('cls'))
+                name = code.co_name
+                if owner is not None:
+                    owner = owner if isinstance(owner, type) else type(owner)
+                    name = f'{owner.__name__}.{name}'
+            return {
+                'frame': f'{filename[len(base_dir):]}:{name}',
+                'line': frame.f_lineno,
+            }
+        frame = frame.f_back
+    return {'frame': None, 'line': None}
+
+
+class SlowQueryRecorder:
+    """execute_wrapper, записывающий запросы дольше порога."""
+
+    def __init__(self, request, threshold):
+        self.request = request
+        self.threshold = threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                self.record(sql, params, many, duration)
+
+    def get_view(self, match):
+        """Путь к представлению, для ViewSet — вместе с действием."""
+        if match is None:
+            return None
+        view = f'{match.func.__module__}.{match.func.__name__}'
+        actions = getattr(match.func, 'actions', None) or {}
+        action = actions.get(self.request.method.lower())
+        return f'{view}.{action}' if action else view
+
+    def record(self, sql, params, many, duration):
+        match = self.request.resolver_match
+        get_logger().warning(json.dumps({
+            'time': timezone.now().isoformat(),
+            'duration': duration,
+            'route': match.view_name if match else None,
+            'view': self.get_view(match),
+            'path': self.request.get_full_path(),
+            'sql': sql,
+            'params': None if many else params,
+            'fingerprint': fingerprint(sql),
+            **app_frame(),
+        }, ensure_ascii=False, default=str))
+
+
+class SlowQueryMiddleware:
+    """Подключает SlowQueryRecorder на время запроса, если задан порог."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = settings.SLOW_QUERY_THRESHOLD
+        if threshold is None:
+            return self.get_response(request)
+        recorder = SlowQueryRecorder(request, threshold)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
+
+
+def read_records(path):
+    """Записи из журнала и его ротированных копий, от старых к новым."""
+    paths = [path] + [
+        f'{path}.{index}'
+        for index in range(1, settings.SLOW_QUERY_LOG_BACKUP_COUNT + 1)
+    ]
+    for log_path in reversed(paths):
+        if not os.path.exists(log_path):
+            continue
+        with open(log_path, encoding='utf-8') as log:
+            for line in log:
+                if line.strip():
+                    yield json.loads(line)
@@ -1,5 +1,6 @@
 from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, TitleViewSet, UserViewSet, signup, token)
+                       ReviewViewSet, TitleViewSet, UserViewSet, export,
+                       metrics, signup, token)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
@@ -23,4 +24,6 @@ urlpatterns = [
     path("v1/", include(v1_router.urls)),
     path("v1/auth/signup/", signup, name="signup"),
     path("v1/auth/token/", token, name="login"),
+    path("v1/export/<str:table>.<str:extension>", export, name="export"),
+    path("v1/metrics/", metrics, name="metrics"),
 ]
@@ -1,50 +1,62 @@
-import uuid
-
-from api.filters import TitleFilter
-from api.mixins import CreateListDestroyMixins
+from api.authentication import SNAPSHOT_FIELDS, make_access_token
+from api.cache import invalidate_catalog
+from api.confirmation import check_confirmation_code, make_confirmation_code
+from api.export import EXPORTS, FORMATS
+from api.filters import FullTextSearchFilter, TitleFilter
+from api.metrics import registry
+from api.mixins import (BulkCreateMixin, CachedListMixin, CachedResponseMixin,
+                        CreateListDestroyMixins, ReviewsVersionMixin,
+                        SparseQuerysetMixin, bulk_insert)
+from api.pagination import FeedPagination
 from api.permissions import IsAdmin, IsAdminUserOrReadOnly, IsAuthorOrIsStaff
 from api.serializers import (CategorySerializer, CommentSerializer,
                              GenreSerializer, ReviewSerializer,
                              SignupSerializer, TitleSerializer,
-                             TokenSerializer, UserSerializer)
-from django.core.mail import send_mail
-from django.db.models import Avg
+                             TokenSerializer, TopTitleSerializer,
+                             TopTitlesQuerySerializer, UserSerializer)
+from django.db.models import F, prefetch_related_objects
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title, User
+from rest_framework.settings import api_settings
+from reviews.errors import ErrorMesage
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.outbox import enqueue_email
+from reviews.search import get_search_backend
+from reviews.signals import update_title_rating
 
 from api_yamdb.settings import ADMIN_EMAIL, LETTERS_SUBJECT
 
 
-class GenreViewSet(CreateListDestroyMixins):
+class GenreViewSet(CachedListMixin, CreateListDestroyMixins):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     lookup_field = "slug"
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ("name",)
+    filter_backends = (FullTextSearchFilter,)
 
 
-class CategoryViewSet(CreateListDestroyMixins):
+class CategoryViewSet(CachedListMixin, CreateListDestroyMixins):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsAdminUserOrReadOnly,)
     lookup_field = "slug"
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ("name",)
+    filter_backends = (FullTextSearchFilter,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg("reviews__score"))
+class TitleViewSet(BulkCreateMixin, SparseQuerysetMixin, CachedResponseMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre"
+    )
     serializer_class = TitleSerializer
     permission_classes = (IsAdminUserOrReadOnly,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter)
     filterset_class = TitleFilter
 
     def perform_create(self, serializer):
@@ -57,6 +69,61 @@ class TitleViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         self.perform_create(serializer)
 
+    @action(detail=False, url_path="top", serializer_class=TopTitleSerializer)
+    def top(self, request):
+        """
+        Лучшие произведения по взвешенному рейтингу.
+
+        Сортировка совпадает с индексами title_top_idx и
+        title_category_top_idx, поэтому база читает только первые
+        `limit` строк индекса, а не сортирует весь каталог.
+        """
+        return self.conditional_response(self.get_top, request)
+
+    def get_top(self, request):
+        params = TopTitlesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            reviews_count__gte=params.validated_data["min_reviews"]
+        ).order_by("-weighted_rating", "-id")
+        serializer = self.get_serializer(
+            queryset[:params.validated_data["limit"]], many=True
+        )
+        return Response(serializer.data)
+
+    def get_bulk_context(self, data):
+        categories, genres = set(), set()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            categories.add(str(item.get("category", "")))
+            genre = item.get("genre")
+            if isinstance(genre, list):
+                genres.update(map(str, genre))
+        return {"related_objects": {
+            Category: Category.objects.in_bulk(categories, field_name="slug"),
+            Genre: Genre.objects.in_bulk(genres, field_name="slug"),
+        }}
+
+    def perform_bulk_create(self, items):
+        titles, genres = [], []
+        for data in items:
+            data = dict(data)
+            genres.append(data.pop("genre"))
+            titles.append(Title(**data))
+        bulk_insert(Title, titles)
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for title, title_genres in zip(titles, genres)
+            for genre in title_genres
+        )
+        prefetch_related_objects(titles, "genre")
+        backend = get_search_backend()
+        for title in titles:
+            backend.index(title)
+        invalidate_catalog()
+        return titles
+
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
@@ -94,13 +161,14 @@ def token(request):
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data["username"]
     confirmation_code = serializer.validated_data["confirmation_code"]
-    user = get_object_or_404(User, username=username)
-    if user.confirmation_code != confirmation_code:
+    user = get_object_or_404(
+        User.objects.only("email", *SNAPSHOT_FIELDS), username=username
+    )
+    if not check_confirmation_code(user, confirmation_code):
         return Response(
             "Код подтверждения неверный", status=status.HTTP_400_BAD_REQUEST
         )
-    refresh = RefreshToken.for_user(user)
-    token_data = {"token": str(refresh.access_token)}
+    token_data = {"token": str(make_access_token(user))}
     return Response(token_data, status=status.HTTP_200_OK)
 
 
@@ -109,52 +177,123 @@ def token(request):
 def signup(request):
     serializer = SignupSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    username = serializer.validated_data["username"]
-    confirmation_code = str(uuid.uuid3(uuid.NAMESPACE_DNS, username))
     try:
         user, created = User.objects.get_or_create(**serializer.validated_data)
-        user.confirmation_code = confirmation_code
-        user.save()
     except Exception as error:
         return Response(
             f"Произошла ошибка ->{error}<-", status=status.HTTP_400_BAD_REQUEST
         )
-    send_mail(
+    enqueue_email(
         subject=LETTERS_SUBJECT,
-        message=f"{user.confirmation_code} - Код для авторизации на сайте",
+        message=(
+            f"{make_confirmation_code(user)} - Код для авторизации на сайте"
+        ),
         from_email=ADMIN_EMAIL,
-        recipient_list=[user.email],
+        recipient=user.email,
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+@api_view(("GET",))
+@permission_classes((IsAdmin,))
+def export(request, table, extension):
+    if table not in EXPORTS or extension not in FORMATS:
+        raise Http404
+    content_type, rows = FORMATS[extension]
+    response = StreamingHttpResponse(rows(table), content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="{table}.{extension}"'
+    )
+    return response
+
+
+@api_view(("GET",))
+@permission_classes((IsAdmin,))
+def metrics(request):
+    return HttpResponse(
+        registry.render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+class ReviewViewSet(BulkCreateMixin, SparseQuerysetMixin, ReviewsVersionMixin,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthorOrIsStaff,)
-
-    def get_title(self):
-        title_id = self.kwargs.get("title_id")
-        return get_object_or_404(Title, id=title_id)
+    pagination_class = FeedPagination
+    sparse_required_fields = ("pub_date",)
+    bulk_conflict_message = ErrorMesage.ONLY_ONE_REVIEW
 
     def get_queryset(self):
         title = self.get_title()
-        return title.reviews.all()
+        return title.reviews.select_related("author")
 
     def perform_create(self, serializer):
         title = self.get_title()
         serializer.save(author=self.request.user, title=title)
 
+    def perform_bulk_create(self, items):
+        # Сигналы post_save не срабатывают при bulk_create, поэтому
+        # рейтинг сдвигается одним UPDATE на всю пачку.
+        title = self.get_title()
+        authors = self.get_bulk_authors()
+        reviewed = set(title.reviews.filter(
+            author_id__in=[author.pk for author in authors if author]
+        ).values_list("author_id", flat=True))
+        results, reviews = [], []
+        for author, data in zip(authors, items):
+            if author is None:
+                results.append(self.bulk_error(
+                    {"author": ["Пользователь не найден."]}
+                ))
+            elif author.pk in reviewed:
+                results.append(self.bulk_error(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [
+                        ErrorMesage.ONLY_ONE_REVIEW
+                    ]}
+                ))
+            else:
+                reviewed.add(author.pk)
+                review = Review(title=title, author=author, **data)
+                reviews.append(review)
+                results.append(review)
+        if reviews:
+            bulk_insert(Review, reviews, natural_key=("title_id", "author_id"))
+            update_title_rating(
+                title.pk, added=[review.score for review in reviews]
+            )
+            invalidate_catalog()
+        return results
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(BulkCreateMixin, SparseQuerysetMixin,
+                     ReviewsVersionMixin, viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthorOrIsStaff,)
+    pagination_class = FeedPagination
+    sparse_required_fields = ("pub_date",)
 
     def get_queryset(self):
-        review_id = self.kwargs.get("review_id")
-        review = get_object_or_404(Review, id=review_id)
-        return review.comments.all()
+        return self.get_review().comments.select_related("author")
 
     def perform_create(self, serializer):
-        review_id = self.kwargs.get("review_id")
-        review = get_object_or_404(Review, id=review_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    def perform_bulk_create(self, items):
+        review = self.get_review()
+        results, comments = [], []
+        for author, data in zip(self.get_bulk_authors(), items):
+            if author is None:
+                results.append(self.bulk_error(
+                    {"author": ["Пользователь не найден."]}
+                ))
+                continue
+            comment = Comment(review=review, author=author, **data)
+            comments.append(comment)
+            results.append(comment)
+        if comments:
+            bulk_insert(Comment, comments)
+            Title.objects.filter(pk=review.title_id).update(
+                reviews_version=F("reviews_version") + 1
+            )
+        return results
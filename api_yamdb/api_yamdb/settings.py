@@ -25,11 +25,14 @@ INSTALLED_APPS = [
     'django_filters',
     'rest_framework',
     'rest_framework_simplejwt',
-    'api.apps.ApiConfig',
     'reviews.apps.ReviewsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.RequestMetricsMiddleware',
+    'api.slow_queries.SlowQueryMiddleware',
+    'api.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -102,6 +105,33 @@ USE_L10N = True
 USE_TZ = True
 
 
+# Cache
+
+# Ответы каталога (жанры, категории, произведения) кэшируются в API_CACHE_ALIAS.
+# LocMemCache вытесняет записи по LRU при переполнении MAX_ENTRIES; чтобы
+# кэш был общим для нескольких процессов, переключите API_CACHE_ALIAS на 'files'.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    'files': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+API_CACHE_ALIAS = 'default'
+# Версия каталога, от которой зависят ключи и ETag ответов, должна быть
+# общей для всех процессов, иначе запись сбросит кэш только в одном из
+# них. 'files' общий для процессов одного сервера; для нескольких
+# серверов укажите общий кэш (memcached, redis).
+CATALOG_VERSION_CACHE_ALIAS = 'files'
+
+
 # Static files (CSS, JavaScript, Images)
 
 STATIC_URL = '/static/'
@@ -119,7 +149,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 5,
@@ -130,7 +160,55 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Сколько секунд аутентификация хранит в кэше роль и статус пользователя.
+AUTH_USER_CACHE_TIMEOUT = 60
+# Класть роль в access-токен. Запросы тогда не читают ни базу, ни кэш,
+# но смена роли применится только к новым токенам.
+JWT_EMBED_USER_CLAIMS = False
+
+# Взвешенный рейтинг для /api/v1/titles/top/: к отзывам произведения
+# добавляется RATING_PRIOR_WEIGHT оценок RATING_PRIOR_SCORE, чтобы
+# одна десятка не поднимала произведение на первое место. 0 — без поправки.
+RATING_PRIOR_SCORE = 5.5
+RATING_PRIOR_WEIGHT = 5
+
+# Метрики запросов, которые отдаёт /api/v1/metrics/. Если задан путь,
+# раз в METRICS_DUMP_INTERVAL секунд в файл дописывается их снимок в JSON.
+METRICS_ENABLED = True
+METRICS_DUMP_PATH = None
+METRICS_DUMP_INTERVAL = 60
+
+# Журнал запросов к базе дольше SLOW_QUERY_THRESHOLD секунд (None — выключен).
+# Сводка: `python manage.py slow_queries`.
+SLOW_QUERY_THRESHOLD = None
+SLOW_QUERY_LOG_PATH = os.path.join(BASE_DIR, 'slow_queries.log')
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUP_COUNT = 5
+
+# Профилирование запросов к API: администратор получает отчёт по
+# `?__profile=cprofile`, а доля PROFILE_SAMPLE_RATE обычных запросов
+# профилируется с сохранением отчёта в PROFILE_DIR (0 — выключено).
+PROFILE_SAMPLE_RATE = 0
+PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+PROFILE_TOP_FUNCTIONS = 30
+
+# Сколько строк выгрузка /api/v1/export/ читает из базы за один запрос.
+EXPORT_CHUNK_SIZE = 2000
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 ADMIN_EMAIL = 'Yamdb67@yandex.ru'
 LETTERS_SUBJECT = 'Код подтверждения'
+CONFIRMATION_CODE_TIMEOUT = 60 * 60 * 24
+
+# Очередь писем: 'worker' — командой `python manage.py send_outbox --loop`,
+# 'thread' — в пуле потоков, 'sync' — отправка в запросе.
+EMAIL_OUTBOX_MODE = 'worker'
+EMAIL_OUTBOX_THREADS = 2
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Сколько секунд взятое на отправку письмо недоступно другим обработчикам.
+EMAIL_OUTBOX_LEASE = 300
+# Как часто фоновый поток режима 'thread' проверяет очередь, в секундах.
+EMAIL_OUTBOX_POLL_INTERVAL = 30
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
 application = get_wsgi_application()
+
+# В режиме EMAIL_OUTBOX_MODE = 'thread' письма из очереди отправляет
+# фоновый поток процесса.
+from reviews.outbox import start_poller  # noqa: E402
+
+start_poller()
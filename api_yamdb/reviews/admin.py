@@ -1,5 +1,6 @@
 from django.contrib import admin
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (HISTOGRAM_FIELDS, Category, Comment, Genre,
+                            OutgoingEmail, Review, Title, User)
 
 admin.site.register(User)
 
@@ -71,7 +72,16 @@ class TitleAdmin(admin.ModelAdmin):
                     'description',
                     'year',
                     'category',
+                    'rating',
+                    'reviews_count',
                     )
+    readonly_fields = ('rating',
+                       'weighted_rating',
+                       'reviews_count',
+                       'score_sum',
+                       'reviews_version',
+                       *HISTOGRAM_FIELDS,
+                       )
     list_filter = ('name',
                    'year',
                    'category',
@@ -82,6 +92,20 @@ class TitleAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """Поля в Admin панели к очереди писем"""
+    list_display = ('id',
+                    'recipient',
+                    'subject',
+                    'created',
+                    'attempts',
+                    'sent_at',
+                    )
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(
     Review,
     ReviewAdmin,
@@ -93,3 +117,4 @@ admin.site.register(
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Genre, GenreAdmin)
 admin.site.register(Title, TitleAdmin)
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
+
+    def ready(self):
+        from django.db.models.signals import (post_delete, post_migrate,
+                                              post_save)
+        from reviews.search import SEARCH_MODELS
+        from reviews.signals import (search_object_deleted,
+                                     search_object_saved, setup_search)
+
+        post_migrate.connect(setup_search, sender=self)
+        # Приёмники подключаются только к моделям поиска: приёмник
+        # post_delete без sender отключил бы быстрое удаление у всех моделей.
+        for model in SEARCH_MODELS:
+            post_save.connect(search_object_saved, sender=model)
+            post_delete.connect(search_object_deleted, sender=model)
@@ -0,0 +1,224 @@
+import math
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Comment, Genre, Review, Title, User
+
+INDEXED_MODELS = (Title, Review, Comment)
+BENCHMARK_CACHE_ALIAS = 'benchmark'
+
+
+def no_response_cache():
+    """
+    Подменяет кэш ответов на DummyCache, чтобы каждый запрос каталога
+    доходил до базы, а не отдавался из кэша.
+    """
+    return override_settings(
+        CACHES={
+            **settings.CACHES,
+            BENCHMARK_CACHE_ALIAS: {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            },
+        },
+        API_CACHE_ALIAS=BENCHMARK_CACHE_ALIAS,
+    )
+
+
+def percentile(sorted_values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время ответа списковых эндпоинтов и планы их запросов '
+        'с индексами, а с --drop-indexes — и без них. Кэш ответов на время '
+        'замеров отключается'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            action='store_true',
+            help='Перед замерами наполнить базу синтетическими данными',
+        )
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--reviews-per-title', type=int, default=20)
+        parser.add_argument('--comments-per-review', type=int, default=1)
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=50,
+            help='Сколько раз запрашивать каждый эндпоинт',
+        )
+        parser.add_argument(
+            '--drop-indexes',
+            action='store_true',
+            help=(
+                'Удалить индексы на время замера «без индексов». Индексы '
+                'удаляются в базе из DATABASES: запускайте только на копии'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options)
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.filter(role=User.ADMIN).first()
+            or User.objects.create(
+                username='benchmark-admin',
+                email='benchmark-admin@yamdb.fake',
+                role=User.ADMIN,
+            )
+        )
+        endpoints = self.get_endpoints()
+
+        runs = []
+        with no_response_cache():
+            if options['drop_indexes']:
+                self.drop_indexes()
+                try:
+                    runs.append(('без индексов', self.run_endpoints(
+                        client, endpoints, options['repeat']
+                    )))
+                finally:
+                    self.create_indexes()
+            else:
+                self.stdout.write(self.style.WARNING(
+                    'Замер без индексов пропущен: он удаляет индексы в базе '
+                    f'{connection.settings_dict["NAME"]}, для него нужен '
+                    'флаг --drop-indexes.'
+                ))
+            runs.append(('с индексами', self.run_endpoints(
+                client, endpoints, options['repeat']
+            )))
+
+        for url in endpoints:
+            self.stdout.write(self.style.MIGRATE_HEADING(url))
+            for label, results in runs:
+                p50, p95, plan = results[url]
+                self.stdout.write(
+                    f'  {label}: p50 {p50:.2f} мс, p95 {p95:.2f} мс'
+                )
+                for line in plan:
+                    self.stdout.write(f'    {line}')
+        self.compare_slug_filters(options['repeat'])
+
+    def get_endpoints(self):
+        review = Review.objects.order_by('?').first()
+        title = Title.objects.order_by('?').first()
+        genre = Genre.objects.order_by('?').first()
+        endpoints = [
+            '/api/v1/titles/',
+            '/api/v1/titles/top/',
+            '/api/v1/users/?search=user1',
+        ]
+        if title:
+            endpoints.append(f'/api/v1/titles/?year={title.year}')
+        if genre:
+            endpoints.append(f'/api/v1/titles/?genre={genre.slug}')
+        if review:
+            endpoints += [
+                f'/api/v1/titles/{review.title_id}/reviews/',
+                f'/api/v1/titles/{review.title_id}/reviews/'
+                f'{review.id}/comments/',
+            ]
+        return endpoints
+
+    def run_endpoints(self, client, endpoints, repeat):
+        results = {}
+        for url in endpoints:
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    client.get(url)
+                    timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            results[url] = (
+                percentile(timings, 50),
+                percentile(timings, 95),
+                self.explain(queries.captured_queries),
+            )
+        return results
+
+    def compare_slug_filters(self, repeat):
+        """Сравнивает старый фильтр по жанру (icontains) с текущим."""
+        from api.filters import TitleFilter
+
+        slugs = list(
+            Genre.objects.filter(titles__isnull=False).distinct()
+            .values_list('slug', flat=True)[:2]
+        )
+        if not slugs:
+            return
+        variants = (
+            ('icontains + JOIN', lambda: Title.objects.filter(
+                genre__slug__icontains=slugs[0]
+            )),
+            ('slug__in + EXISTS', lambda: TitleFilter(
+                {'genre': ','.join(slugs)}, queryset=Title.objects.all()
+            ).qs),
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'Фильтр по жанру: {", ".join(slugs)}'
+        ))
+        for label, build in variants:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                found = list(build().values_list('pk', flat=True))
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'  {label}: p50 {percentile(timings, 50):.2f} мс, '
+                f'p95 {percentile(timings, 95):.2f} мс, '
+                f'строк {len(found)}, уникальных {len(set(found))}'
+            )
+
+    def explain(self, captured_queries):
+        """Возвращает планы всех SELECT, выполненных при запросе."""
+        plan = []
+        with connection.cursor() as cursor:
+            for query in captured_queries:
+                if not query['sql'].lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(
+                    f'{connection.ops.explain_query_prefix()} {query["sql"]}'
+                )
+                plan.append(query['sql'][:100])
+                plan += [
+                    '  ' + ' '.join(str(column) for column in row)
+                    for row in cursor.fetchall()
+                ]
+        return plan
+
+    def drop_indexes(self):
+        with connection.schema_editor() as editor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+
+    def create_indexes(self):
+        with connection.schema_editor() as editor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    editor.add_index(model, index)
+
+    def seed(self, options):
+        call_command(
+            'seed_synthetic',
+            titles=options['titles'],
+            users=options['users'],
+            reviews_per_title=options['reviews_per_title'],
+            comments_per_review=options['comments_per_review'],
+            stdout=self.stdout,
+        )
@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api.confirmation import make_confirmation_code
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+from reviews.models import User
+
+
+class Command(BaseCommand):
+    help = 'Замеряет пропускную способность signup и выдачи токена'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        prefix = f'authbench{int(time.time())}'
+        usernames = [f'{prefix}_{i}' for i in range(options['users'])]
+        # Письма не отправляются, чтобы замерять только работу API и базы.
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend',
+            EMAIL_OUTBOX_MODE='sync',
+        ):
+            self.run_phase('signup', self.signup, usernames, options)
+            self.run_phase('token', self.token, usernames, options)
+        User.objects.filter(username__startswith=prefix).delete()
+
+    def run_phase(self, name, request, usernames, options):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            statuses = list(executor.map(request, usernames))
+        elapsed = time.perf_counter() - started
+        errors = sum(status != 200 for status in statuses)
+        self.stdout.write(
+            f'{name}: {len(usernames)} запросов в {options["threads"]} '
+            f'потоков за {elapsed:.2f} с — '
+            f'{len(usernames) / elapsed:.0f} запросов/с, ошибок {errors}'
+        )
+
+    def signup(self, username):
+        try:
+            return Client().post('/api/v1/auth/signup/', {
+                'username': username,
+                'email': f'{username}@yamdb.fake',
+            }).status_code
+        finally:
+            connections.close_all()
+
+    def token(self, username):
+        try:
+            user = User.objects.only('id', 'email').filter(
+                username=username
+            ).first()
+            if user is None:
+                return None
+            return Client().post('/api/v1/auth/token/', {
+                'username': username,
+                'confirmation_code': make_confirmation_code(user),
+            }).status_code
+        finally:
+            connections.close_all()
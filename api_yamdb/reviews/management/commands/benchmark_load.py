@@ -0,0 +1,350 @@
+import json
+import time
+
+from api.authentication import make_access_token
+from api.cache import invalidate_catalog
+from api.confirmation import make_confirmation_code
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from reviews.management.commands.benchmark_api import percentile
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+COUNTED_MODELS = (User, Category, Genre, Title, Review, Comment)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает эндпоинты API на чтение и запись (включая массовое '
+        'создание) через тестовый клиент и сохраняет пропускную '
+        'способность, задержки и число запросов к базе в JSON. Созданные '
+        'при замерах объекты удаляются'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=100,
+            help='Сколько раз запрашивать каждый эндпоинт',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Сколько запросов сделать до начала замеров',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Сбрасывать кэш каталога перед каждым запросом',
+        )
+        parser.add_argument(
+            '--only',
+            action='append',
+            help='Замерить только указанный эндпоинт (можно повторять)',
+        )
+        parser.add_argument('--output', help='Файл для результатов в JSON')
+        parser.add_argument(
+            '--compare',
+            help='JSON предыдущего запуска для сравнения',
+        )
+
+    def handle(self, *args, **options):
+        title = Title.objects.order_by('-reviews_count', 'pk').first()
+        if title is None:
+            raise CommandError(
+                'В базе нет произведений: выполните seed_synthetic '
+                'или load_to_database.'
+            )
+        self.prefix = f'loadbench{int(time.time())}'
+        self.counter = 0
+        self.admin = self.get_user('admin', User.ADMIN)
+        self.user = self.get_user('user', User.USER)
+        endpoints = self.get_endpoints(title)
+        if options['only']:
+            endpoints = [
+                endpoint for endpoint in endpoints
+                if endpoint[0] in options['only']
+            ]
+
+        results = {}
+        # Письма не отправляются, чтобы замерять только работу API и базы.
+        with override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend',
+            EMAIL_OUTBOX_MODE='sync',
+        ):
+            try:
+                for endpoint in endpoints:
+                    results[endpoint[0]] = self.run_endpoint(
+                        *endpoint, options
+                    )
+            finally:
+                self.cleanup()
+
+        report = {
+            'started': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'cold': options['cold'],
+            'rows': {
+                model._meta.model_name: model.objects.count()
+                for model in COUNTED_MODELS
+            },
+            'endpoints': results,
+        }
+        self.print_report(report, self.load(options['compare']))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Результаты сохранены в {options["output"]}')
+
+    def get_user(self, name, role):
+        user = User.objects.filter(role=role, is_superuser=False).first()
+        if user is None:
+            user = User.objects.create(
+                username=f'{self.prefix}-{name}',
+                email=f'{self.prefix}-{name}@yamdb.fake',
+                role=role,
+            )
+        return user
+
+    def client(self, user=None, format=None):
+        client = APIClient()
+        if format is not None:
+            client.default_format = format
+        if user is not None:
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {make_access_token(user)}'
+            )
+        return client
+
+    def get_endpoints(self, title):
+        """
+        Эндпоинты в виде (имя, клиент, метод, функция url и данных).
+
+        Функция вызывается перед каждым запросом, чтобы запросы на запись
+        получали уникальные данные.
+        """
+        anonymous = self.client()
+        admin = self.client(self.admin)
+        user = self.client(self.user)
+        titles = f'/api/v1/titles/{title.pk}'
+        review = title.reviews.order_by('pk').first()
+        genre = Genre.objects.filter(titles=title).first()
+        word = title.name.split()[-1]
+        endpoints = [
+            ('titles', anonymous, 'get', lambda: ('/api/v1/titles/', None)),
+            ('titles_fields', anonymous, 'get', lambda: (
+                '/api/v1/titles/?fields=id,name,rating', None
+            )),
+            ('titles_search', anonymous, 'get', lambda: (
+                f'/api/v1/titles/?search={word}', None
+            )),
+            ('titles_top', anonymous, 'get', lambda: (
+                '/api/v1/titles/top/', None
+            )),
+            ('title', anonymous, 'get', lambda: (f'{titles}/', None)),
+            ('genres', anonymous, 'get', lambda: ('/api/v1/genres/', None)),
+            ('categories', anonymous, 'get', lambda: (
+                '/api/v1/categories/', None
+            )),
+            ('reviews', anonymous, 'get', lambda: (
+                f'{titles}/reviews/', None
+            )),
+            ('reviews_cursor', anonymous, 'get', lambda: (
+                f'{titles}/reviews/?cursor=', None
+            )),
+            ('users', admin, 'get', lambda: ('/api/v1/users/', None)),
+            ('users_me', user, 'get', lambda: ('/api/v1/users/me/', None)),
+            ('signup', anonymous, 'post', lambda: (
+                '/api/v1/auth/signup/', self.signup_data()
+            )),
+            ('token', anonymous, 'post', lambda: ('/api/v1/auth/token/', {
+                'username': self.user.username,
+                'confirmation_code': make_confirmation_code(self.user),
+            })),
+        ]
+        if genre is not None:
+            endpoints.append(('titles_genre', anonymous, 'get', lambda: (
+                f'/api/v1/titles/?genre={genre.slug}', None
+            )))
+        if review is not None:
+            comments = f'{titles}/reviews/{review.pk}/comments/'
+            endpoints += [
+                ('review', anonymous, 'get', lambda: (
+                    f'{titles}/reviews/{review.pk}/', None
+                )),
+                ('comments', anonymous, 'get', lambda: (comments, None)),
+                ('comment_create', user, 'post', lambda: (
+                    comments, {'text': f'{self.prefix} комментарий'}
+                )),
+                ('comment_bulk', self.client(self.user, 'json'), 'post',
+                 lambda: (f'{comments}bulk/', [
+                     {'text': f'{self.prefix} комментарий {i}'}
+                     for i in range(10)
+                 ])),
+            ]
+        return endpoints + self.get_write_endpoints(title, admin, user)
+
+    def get_write_endpoints(self, title, admin, user):
+        """
+        Запись произведений, отзывов и пользователей.
+
+        Объекты, которые запрос меняет или удаляет, создаются в функции
+        url и данных, то есть до начала замера, и помечаются префиксом,
+        чтобы cleanup их удалил.
+        """
+        category = title.category or Category.objects.first()
+        genre = Genre.objects.first()
+        admin_json = self.client(self.admin, 'json')
+        own_review = Review.objects.create(
+            title=self.bench_title(category), author=self.user,
+            text=f'{self.prefix} отзыв', score=5,
+        )
+        authors = list(
+            User.objects.order_by('pk').values_list('username', flat=True)[:10]
+        )
+        endpoints = [
+            ('review_create', user, 'post', lambda: (
+                f'/api/v1/titles/{self.bench_title(category).pk}/reviews/',
+                {'text': f'{self.prefix} отзыв', 'score': 7},
+            )),
+            ('review_update', user, 'patch', lambda: (
+                f'/api/v1/titles/{own_review.title_id}/reviews/'
+                f'{own_review.pk}/',
+                {'score': self.next_counter() % 10 + 1},
+            )),
+            ('review_delete', user, 'delete', lambda: (
+                self.bench_review_url(category), None
+            )),
+            ('review_bulk', admin_json, 'post', lambda: (
+                f'/api/v1/titles/{self.bench_title(category).pk}'
+                '/reviews/bulk/',
+                [{'text': f'{self.prefix} отзыв', 'score': 6,
+                  'author': author} for author in authors],
+            )),
+            ('user_create', admin, 'post', lambda: (
+                '/api/v1/users/', self.signup_data()
+            )),
+            ('users_me_update', user, 'patch', lambda: (
+                '/api/v1/users/me/', {'bio': self.user.bio}
+            )),
+        ]
+        if category is None or genre is None:
+            return endpoints
+        bench_title = self.bench_title(category)
+        return endpoints + [
+            ('title_create', admin, 'post', lambda: (
+                '/api/v1/titles/', self.title_data(category, genre)
+            )),
+            ('title_update', admin, 'patch', lambda: (
+                f'/api/v1/titles/{bench_title.pk}/',
+                self.title_data(category, genre),
+            )),
+            ('title_delete', admin, 'delete', lambda: (
+                f'/api/v1/titles/{self.bench_title(category).pk}/', None
+            )),
+            ('title_bulk', admin_json, 'post', lambda: (
+                '/api/v1/titles/bulk/',
+                [self.title_data(category, genre) for _ in range(10)],
+            )),
+        ]
+
+    def title_data(self, category, genre):
+        return {
+            'name': f'{self.prefix} произведение {self.next_counter()}',
+            'year': 2000,
+            'category': category.slug,
+            'genre': [genre.slug],
+            'description': f'{self.prefix} описание',
+        }
+
+    def next_counter(self):
+        self.counter += 1
+        return self.counter
+
+    def bench_title(self, category):
+        return Title.objects.create(
+            name=f'{self.prefix} произведение {self.next_counter()}',
+            year=2000,
+            category=category,
+        )
+
+    def bench_review_url(self, category):
+        review = Review.objects.create(
+            title=self.bench_title(category), author=self.user,
+            text=f'{self.prefix} отзыв', score=5,
+        )
+        return f'/api/v1/titles/{review.title_id}/reviews/{review.pk}/'
+
+    def signup_data(self):
+        username = f'{self.prefix}_{self.next_counter()}'
+        return {'username': username, 'email': f'{username}@yamdb.fake'}
+
+    def run_endpoint(self, name, client, method, build, options):
+        request = getattr(client, method)
+        for _ in range(options['warmup']):
+            request(*build())
+        timings, queries, errors = [], 0, 0
+        started = time.perf_counter()
+        for _ in range(options['requests']):
+            url, data = build()
+            if options['cold']:
+                invalidate_catalog()
+            with CaptureQueriesContext(connection) as captured:
+                request_started = time.perf_counter()
+                response = request(url, data)
+                timings.append(
+                    (time.perf_counter() - request_started) * 1000
+                )
+            queries += len(captured)
+            errors += response.status_code >= 400
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        return {
+            'throughput': len(timings) / elapsed,
+            'p50': percentile(timings, 50),
+            'p95': percentile(timings, 95),
+            'p99': percentile(timings, 99),
+            'queries': queries / len(timings),
+            'errors': errors,
+        }
+
+    def cleanup(self):
+        Comment.objects.filter(text__startswith=self.prefix).delete()
+        Review.objects.filter(text__startswith=self.prefix).delete()
+        Title.objects.filter(name__startswith=self.prefix).delete()
+        User.objects.filter(username__startswith=self.prefix).delete()
+
+    def load(self, path):
+        if not path:
+            return {}
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)['endpoints']
+
+    def print_report(self, report, previous):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{report["requests"]} запросов на эндпоинт, '
+            f'{report["database"]}, строк: '
+            + ', '.join(f'{name} {count}'
+                        for name, count in report['rows'].items())
+        ))
+        for name, result in report['endpoints'].items():
+            line = (
+                f'{name:<16} {result["throughput"]:8.1f} запросов/с  '
+                f'p50 {result["p50"]:7.2f} мс  p95 {result["p95"]:7.2f} мс  '
+                f'p99 {result["p99"]:7.2f} мс  '
+                f'запросов к базе {result["queries"]:5.1f}'
+            )
+            if result['errors']:
+                line += f'  ошибок {result["errors"]}'
+            if name in previous:
+                before = previous[name]
+                line += '  (p50 {:+.0%}, запросов/с {:+.0%})'.format(
+                    result['p50'] / before['p50'] - 1,
+                    result['throughput'] / before['throughput'] - 1,
+                )
+            self.stdout.write(line)
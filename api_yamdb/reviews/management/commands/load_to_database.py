@@ -1,66 +1,216 @@
 import csv
+import time
+from contextlib import contextmanager, nullcontext
+from itertools import islice
 
-from django.core.management.base import BaseCommand
+from api.cache import invalidate_catalog
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import CASCADE, DO_NOTHING, SET_NULL
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.search import SEARCH_MODELS
+
+DATA_DIR = settings.BASE_DIR / 'static/data'
+DEFAULT_BATCH_SIZE = 1000
+
+# Порядок важен: таблицы загружаются после тех, на которые ссылаются.
+TABLES = (
+    ('users', 'users.csv', User, lambda row: dict(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row['role'],
+        bio=row['bio'],
+        first_name=row['first_name'],
+        last_name=row['last_name'],
+    )),
+    ('category', 'category.csv', Category, lambda row: dict(
+        id=row['id'],
+        name=row['name'],
+        slug=row['slug'],
+    )),
+    ('genre', 'genre.csv', Genre, lambda row: dict(
+        id=row['id'],
+        name=row['name'],
+        slug=row['slug'],
+    )),
+    ('titles', 'titles.csv', Title, lambda row: dict(
+        id=row['id'],
+        year=row['year'],
+        name=row['name'],
+        category_id=row['category'] or None,
+        description=row.get('description', ''),
+    )),
+    ('genre_title', 'genre_title.csv', Title.genre.through, lambda row: dict(
+        id=row['id'],
+        title_id=row['title_id'],
+        genre_id=row['genre_id'],
+    )),
+    ('review', 'review.csv', Review, lambda row: dict(
+        id=row['id'],
+        title_id=row['title_id'],
+        text=row['text'],
+        author_id=row['author'],
+        score=row['score'],
+        pub_date=row['pub_date'],
+    )),
+    ('comments', 'comments.csv', Comment, lambda row: dict(
+        id=row['id'],
+        review_id=row['review_id'],
+        text=row['text'],
+        author_id=row['author'],
+        pub_date=row['pub_date'],
+    )),
+)
+
+
+def read_batches(path, batch_size):
+    """Читает CSV-файл порциями, не загружая его в память целиком."""
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        rows = csv.DictReader(csv_file)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+
+@contextmanager
+def keep_auto_now_add(model):
+    """
+    Отключает auto_now_add, чтобы bulk_create сохранил даты из файла.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
 
 
 class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов в static/data'
 
-    def handle(self, *args, **kwargs):
-        for row in csv.DictReader(open('./static/data/users.csv')):
-            user = User(
-                id=row['id'],
-                username=row['username'],
-                email=row['email'],
-                role=row['role'],
-                bio=row['bio'],
-                first_name=row['first_name'],
-                last_name=row['last_name']
-            )
-            user.save()
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Количество строк в одном INSERT',
+        )
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help='Очистить таблицы перед загрузкой',
+        )
+        parser.add_argument(
+            '--only',
+            action='append',
+            choices=[name for name, *_ in TABLES],
+            help='Загрузить только указанную таблицу (можно повторять)',
+        )
 
-        for row in csv.DictReader(open('./static/data/category.csv')):
-            category = Category(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug']
-            )
-            category.save()
-
-        for row in csv.DictReader(open('./static/data/titles.csv')):
-            title = Title(
-                id=row['id'],
-                year=row['year'],
-                name=row['name'],
-                category_id=row['category']
-            )
-            title.save()
+    def handle(self, *args, **options):
+        tables = [
+            table for table in TABLES
+            if not options['only'] or table[0] in options['only']
+        ]
+        changed = {model for _, _, model, _ in tables}
+        # С --truncate очистка и загрузка идут одной транзакцией: если
+        # загрузка упадёт, таблицы не останутся пустыми.
+        with (transaction.atomic() if options['truncate']
+              else nullcontext()):
+            if options['truncate']:
+                changed |= self.truncate(
+                    [model for _, _, model, _ in reversed(tables)]
+                )
+            for name, filename, model, build in tables:
+                self.load_table(
+                    name, DATA_DIR / filename, model, build,
+                    options['batch_size'],
+                )
 
-        for row in csv.DictReader(open('./static/data/genre.csv')):
-            genre = Genre(
-                id=row['id'],
-                name=row['name'],
-                slug=row['slug']
-            )
-            genre.save()
-
-        for row in csv.DictReader(open('./static/data/review.csv')):
-            review = Review(
-                id=row['id'],
-                title_id=row['title_id'],
-                text=row['text'],
-                author_id=row['author'],
-                score=row['score'],
-                pub_date=row['pub_date']
-            )
-            review.save()
-
-        for row in csv.DictReader(open('./static/data/comments.csv')):
-            comments = Comment(
-                id=row['id'],
-                review_id=row['review_id'],
-                text=row['text'],
-                author_id=row['author'],
-                pub_date=row['pub_date']
+        self.reset_sequences([model for _, _, model, _ in tables])
+        if Review in changed:
+            call_command('recalculate_ratings', stdout=self.stdout)
+            call_command('rebuild_histograms', stdout=self.stdout)
+        if changed & set(SEARCH_MODELS):
+            call_command('rebuild_search_index', stdout=self.stdout)
+        # bulk_create не вызывает сигналы, поэтому кэш каталога
+        # сбрасывается явно.
+        invalidate_catalog()
+
+    def truncate(self, models):
+        """
+        Очищает таблицы одним DELETE на каждую, без загрузки строк
+        и сигналов: рейтинги и индексы пересчитываются после загрузки.
+
+        Как и каскадное удаление Django, очищает также таблицы, которые
+        ссылаются на очищаемые с on_delete=CASCADE, а ссылки SET_NULL
+        обнуляет одним UPDATE. Возвращает множество очищенных моделей.
+        """
+        truncated = []
+
+        def collect(model):
+            if model in truncated:
+                return
+            for relation in model._meta.get_fields(include_hidden=True):
+                if not (relation.auto_created and not relation.concrete
+                        and (relation.one_to_many or relation.one_to_one)):
+                    continue
+                field = relation.field.name
+                if relation.on_delete is CASCADE:
+                    collect(relation.related_model)
+                elif relation.on_delete is SET_NULL:
+                    relation.related_model.objects.filter(**{
+                        f'{field}__isnull': False
+                    }).update(**{field: None})
+                elif relation.on_delete is not DO_NOTHING:
+                    raise CommandError(
+                        f'--truncate не поддерживает '
+                        f'{relation.on_delete.__name__} у '
+                        f'{relation.related_model.__name__}.{field}'
+                    )
+            # Ссылающиеся таблицы добавлены раньше и очищаются первыми.
+            truncated.append(model)
+
+        for model in models:
+            collect(model)
+        for model in truncated:
+            deleted = model.objects.all()._raw_delete(model.objects.db)
+            self.stdout.write(
+                f'{model._meta.db_table}: удалено {deleted} строк'
             )
-            comments.save()
+        return set(truncated)
+
+    def load_table(self, name, path, model, build, batch_size):
+        started = time.monotonic()
+        total = 0
+        with transaction.atomic(), keep_auto_now_add(model):
+            for batch in read_batches(path, batch_size):
+                model.objects.bulk_create(
+                    [model(**build(row)) for row in batch],
+                    batch_size=batch_size,
+                )
+                total += len(batch)
+                self.stdout.write(f'{name}: {total} строк...', ending='\r')
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'{name}: загружено {total} строк за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else total:.0f} строк/с)'
+        ))
+
+    def reset_sequences(self, models):
+        """Сдвигает счётчики id после вставки строк с явными id."""
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
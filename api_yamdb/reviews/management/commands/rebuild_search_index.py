@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from reviews.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс произведений, жанров и категорий'
+
+    def handle(self, *args, **kwargs):
+        backend = get_search_backend()
+        backend.setup()
+        backend.rebuild()
+        self.stdout.write(
+            f'Поисковый индекс перестроен ({type(backend).__name__})'
+        )
@@ -0,0 +1,55 @@
+from api.cache import invalidate_catalog
+from django.core.management.base import BaseCommand
+from django.db.models import (Avg, Count, F, IntegerField, OuterRef, Subquery,
+                              Sum, Value)
+from django.db.models.functions import Coalesce
+from reviews.models import Review, Title
+from reviews.signals import bayesian_rating
+
+
+def title_reviews(aggregate):
+    return Subquery(
+        Review.objects.filter(title=OuterRef('pk'))
+        .order_by()
+        .values('title')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+
+
+class Command(BaseCommand):
+    """
+    Пересчитывает score_sum, reviews_count, rating и weighted_rating
+    по таблице отзывов.
+
+    Сигналы сдвигают эти счётчики на разницу оценок, поэтому любое
+    расхождение — запись в обход сигналов (bulk_create, update, правка
+    в базе) или сбой между записью отзыва и обновлением произведения —
+    сохраняется навсегда. Команда — способ его исправить; гистограммы
+    оценок так же пересчитывает rebuild_histograms.
+    """
+
+    help = (
+        'Пересчитывает сохранённые рейтинги всех произведений; '
+        'исправляет расхождение счётчиков с отзывами'
+    )
+
+    def handle(self, *args, **kwargs):
+        updated = Title.objects.update(
+            score_sum=Coalesce(
+                title_reviews(Sum('score')), Value(0),
+                output_field=IntegerField(),
+            ),
+            reviews_count=Coalesce(
+                title_reviews(Count('pk')), Value(0),
+                output_field=IntegerField(),
+            ),
+            rating=title_reviews(Avg('score')),
+        )
+        Title.objects.update(weighted_rating=bayesian_rating(
+            F('score_sum'), F('reviews_count')
+        ))
+        # update() не вызывает сигналы, поэтому кэш каталога
+        # сбрасывается явно.
+        invalidate_catalog()
+        self.stdout.write(f'Пересчитан рейтинг {updated} произведений')
@@ -0,0 +1,224 @@
+import math
+import random
+import time
+from datetime import timedelta
+
+from api.cache import invalidate_catalog
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from reviews.management.commands.load_to_database import keep_auto_now_add
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+# Показатель закона Ципфа: насколько популярность сосредоточена
+# в первых произведениях и самых активных пользователях.
+ZIPF_EXPONENT = 1.1
+WORDS = (
+    'тайна', 'город', 'ночь', 'дорога', 'море', 'война', 'любовь', 'звезда',
+    'сад', 'остров', 'зима', 'огонь', 'тень', 'песня', 'река', 'небо',
+)
+
+
+def zipf_weights(count):
+    return [1 / (rank ** ZIPF_EXPONENT) for rank in range(1, count + 1)]
+
+
+def weighted_sample(rnd, population, weights, k):
+    """
+    k разных элементов, выбранных с учётом весов.
+
+    Если нужна почти вся выборка, веса уже ничего не решают,
+    и берётся обычная случайная выборка.
+    """
+    if k * 2 > len(population):
+        return rnd.sample(population, k)
+    chosen = set()
+    while len(chosen) < k:
+        chosen.update(rnd.choices(population, weights, k=k - len(chosen)))
+    return list(chosen)
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу синтетическими пользователями, произведениями, '
+        'отзывами и комментариями с неравномерной популярностью'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=5000)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument(
+            '--reviews-per-title',
+            type=int,
+            default=20,
+            help='Среднее число отзывов на произведение',
+        )
+        parser.add_argument(
+            '--comments-per-review',
+            type=float,
+            default=1,
+            help='Среднее число комментариев к отзыву',
+        )
+        parser.add_argument(
+            '--random-seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора, чтобы данные повторялись',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help=(
+                'Количество строк в одном INSERT (по умолчанию — '
+                'наибольшее, которое допускает база)'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.rnd = random.Random(options['random_seed'])
+        self.prefix = f'seed{int(time.time())}'
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        started = time.monotonic()
+        with transaction.atomic():
+            categories = self.create_categories(options['categories'])
+            genres = self.create_genres(options['genres'])
+            users = self.create_users(options['users'])
+            titles = self.create_titles(options['titles'], categories, genres)
+            reviews = self.create_reviews(
+                titles, users, options['reviews_per_title']
+            )
+            self.create_comments(
+                reviews, users, options['comments_per_review']
+            )
+        call_command('recalculate_ratings', stdout=self.stdout)
+        call_command('rebuild_histograms', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        # bulk_create не вызывает сигналы, поэтому кэш каталога
+        # сбрасывается явно.
+        invalidate_catalog()
+        self.stdout.write(self.style.SUCCESS(
+            f'Данные с префиксом {self.prefix} созданы за '
+            f'{time.monotonic() - started:.2f} с'
+        ))
+
+    def bulk_create(self, model, objs, lookup):
+        """Вставляет объекты и возвращает id созданных строк."""
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        ids = list(
+            model.objects.filter(**lookup).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {len(ids)}')
+        return ids
+
+    def past_date(self, days):
+        return self.now - timedelta(days=self.rnd.uniform(0, days))
+
+    def create_categories(self, count):
+        return self.bulk_create(Category, (
+            Category(name=f'Категория {i}', slug=f'{self.prefix}-c{i}')
+            for i in range(count)
+        ), {'slug__startswith': self.prefix})
+
+    def create_genres(self, count):
+        return self.bulk_create(Genre, (
+            Genre(name=f'Жанр {i}', slug=f'{self.prefix}-g{i}')
+            for i in range(count)
+        ), {'slug__startswith': self.prefix})
+
+    def create_users(self, count):
+        return self.bulk_create(User, (
+            User(
+                username=f'{self.prefix}user{i}',
+                email=f'{self.prefix}user{i}@yamdb.fake',
+            )
+            for i in range(count)
+        ), {'username__startswith': self.prefix})
+
+    def create_titles(self, count, categories, genres):
+        rnd = self.rnd
+        category_weights = zipf_weights(len(categories))
+        genre_weights = zipf_weights(len(genres))
+        titles = self.bulk_create(Title, (
+            Title(
+                name=f'{self.prefix} ' + ' '.join(rnd.sample(WORDS, 3)),
+                description='',
+                # Новых произведений больше, чем старых.
+                year=max(1900, self.now.year - int(rnd.expovariate(1 / 15))),
+                category_id=rnd.choices(categories, category_weights)[0],
+            )
+            for _ in range(count)
+        ), {'name__startswith': self.prefix})
+        Title.genre.through.objects.bulk_create(
+            (
+                Title.genre.through(title_id=title_id, genre_id=genre_id)
+                for title_id in titles
+                for genre_id in weighted_sample(
+                    rnd, genres, genre_weights,
+                    min(rnd.randint(1, 3), len(genres)),
+                )
+            ),
+            batch_size=self.batch_size,
+        )
+        return titles
+
+    def create_reviews(self, titles, users, per_title):
+        """
+        Отзывы распределяются по произведениям по закону Ципфа,
+        а авторы выбираются с учётом активности пользователей.
+        """
+        rnd = self.rnd
+        title_weights = zipf_weights(len(titles))
+        total = per_title * len(titles)
+        scale = total / sum(title_weights) if titles else 0
+        user_weights = zipf_weights(len(users))
+
+        def reviews():
+            for title_id, weight in zip(titles, title_weights):
+                count = min(len(users), math.ceil(weight * scale))
+                quality = rnd.gauss(6.5, 1.5)
+                for author_id in weighted_sample(
+                    rnd, users, user_weights, count
+                ):
+                    yield Review(
+                        title_id=title_id,
+                        author_id=author_id,
+                        text='Отзыв',
+                        score=min(10, max(1, round(rnd.gauss(quality, 2)))),
+                        pub_date=self.past_date(3 * 365),
+                    )
+
+        with keep_auto_now_add(Review):
+            return self.bulk_create(
+                Review, reviews(), {'title__name__startswith': self.prefix}
+            )
+
+    def create_comments(self, reviews, users, per_review):
+        if not per_review:
+            return
+        rnd = self.rnd
+        user_weights = zipf_weights(len(users))
+
+        def comments():
+            for review_id in reviews:
+                count = int(rnd.expovariate(1 / per_review))
+                for author_id in rnd.choices(users, user_weights, k=count):
+                    yield Comment(
+                        review_id=review_id,
+                        author_id=author_id,
+                        text='Комментарий',
+                        pub_date=self.past_date(365),
+                    )
+
+        with keep_auto_now_add(Comment):
+            Comment.objects.bulk_create(
+                comments(), batch_size=self.batch_size
+            )
+        count = Comment.objects.filter(
+            review__title__name__startswith=self.prefix
+        ).count()
+        self.stdout.write(f'{Comment._meta.verbose_name_plural}: {count}')
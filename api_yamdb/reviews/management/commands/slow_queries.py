@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+from api.slow_queries import read_records
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка по журналу медленных запросов: самые дорогие запросы, '
+        'сгруппированные по виду SQL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=10,
+            help='Сколько запросов показать',
+        )
+        parser.add_argument(
+            '--order',
+            choices=('total', 'max', 'count'),
+            default='total',
+            help='Сортировка: суммарное время, худшее время или количество',
+        )
+        parser.add_argument(
+            '--path',
+            default=settings.SLOW_QUERY_LOG_PATH,
+            help='Файл журнала',
+        )
+
+    def handle(self, *args, **options):
+        groups = defaultdict(lambda: {
+            'count': 0, 'total': 0, 'max': 0,
+            'routes': defaultdict(int), 'frames': defaultdict(int),
+        })
+        for record in read_records(options['path']):
+            group = groups[record['fingerprint']]
+            group['count'] += 1
+            group['total'] += record['duration']
+            if record['duration'] >= group['max']:
+                group['max'] = record['duration']
+                group['example'] = record
+            group['routes'][record['route']] += 1
+            group['frames'][record['frame']] += 1
+        if not groups:
+            self.stdout.write('Медленных запросов не найдено')
+            return
+
+        worst = sorted(
+            groups.items(), key=lambda item: item[1][options['order']],
+            reverse=True,
+        )[:options['limit']]
+        for position, (sql, group) in enumerate(worst, 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{position}. {group["count"]} раз, всего '
+                f'{group["total"] * 1000:.1f} мс, в среднем '
+                f'{group["total"] / group["count"] * 1000:.1f} мс, худший '
+                f'{group["max"] * 1000:.1f} мс'
+            ))
+            self.stdout.write(f'   {sql}')
+            for label, counts in (('маршруты', group['routes']),
+                                  ('код', group['frames'])):
+                self.stdout.write(f'   {label}: ' + ', '.join(
+                    f'{name} ({count})' for name, count in sorted(
+                        counts.items(), key=lambda item: -item[1]
+                    )
+                ))
+            example = group['example']
+            self.stdout.write(
+                f'   худший: {example["path"]}, '
+                f'параметры {example["params"]}'
+            )
@@ -1,10 +1,20 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.utils import timezone
 
 from reviews.validators import validate_username
 
+SCORES = range(1, 11)
+
+
+def histogram_field(score):
+    """Имя поля Title со счётчиком отзывов с оценкой score."""
+    return f'score_{score}_count'
+
+
+HISTOGRAM_FIELDS = tuple(histogram_field(score) for score in SCORES)
+
 
 class Genre(models.Model):
     """Жанр произведения"""
@@ -77,9 +87,6 @@ class User(AbstractUser):
         choices=ROLES,
         default=USER,
     )
-    confirmation_code = models.CharField(
-        max_length=150, blank=True, verbose_name="Код для идентификации"
-    )
 
     class Meta:
         verbose_name = "Пользователь"
@@ -133,8 +140,88 @@ class Title(models.Model):
         help_text='укажите категорию произведения',
         related_name='titles'
     )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Рейтинг',
+        help_text='Средняя оценка, пересчитывается при изменении отзывов',
+    )
+    weighted_rating = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name='Взвешенный рейтинг',
+        help_text=(
+            'Байесовская оценка для топа: средняя, сдвинутая к '
+            'RATING_PRIOR_SCORE, пока отзывов мало'
+        ),
+    )
+    reviews_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов',
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок',
+    )
+    reviews_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Версия отзывов',
+        help_text='Растёт при любом изменении отзывов и комментариев',
+    )
+    # Гистограмма оценок: по счётчику на каждую оценку из SCORES
+    # (имена — histogram_field), обновляются вместе с рейтингом.
+    score_1_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «1»',
+    )
+    score_2_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «2»',
+    )
+    score_3_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «3»',
+    )
+    score_4_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «4»',
+    )
+    score_5_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «5»',
+    )
+    score_6_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «6»',
+    )
+    score_7_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «7»',
+    )
+    score_8_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «8»',
+    )
+    score_9_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «9»',
+    )
+    score_10_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок «10»',
+    )
 
     class Meta:
+        indexes = (
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(
+                fields=('-weighted_rating', '-id'), name='title_top_idx'
+            ),
+            models.Index(
+                fields=('category', '-weighted_rating', '-id'),
+                name='title_category_top_idx',
+            ),
+        )
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
@@ -165,8 +252,8 @@ class Review(models.Model):
     )
     score = models.PositiveSmallIntegerField(
         validators=(
-            MinValueValidator(1),
-            MaxValueValidator(10),
+            MinValueValidator(SCORES[0]),
+            MaxValueValidator(SCORES[-1]),
         ),
         verbose_name="Рейтинг произведения",
         help_text="Рейтинг произведения",
@@ -187,13 +274,48 @@ class Review(models.Model):
                 name="unique_title_author",
             ),
         )
-        ordering = ("-pub_date",)
+        indexes = (
+            models.Index(
+                fields=("title", "-pub_date", "-id"),
+                name="review_title_feed_idx",
+            ),
+        )
+        ordering = ("-pub_date", "-id")
         verbose_name = "Отзыв"
         verbose_name_plural = "Отзывы"
 
     def __str__(self):
         return self.text
 
+    def locked_score(self):
+        """
+        Текущая оценка отзыва в базе; строка блокируется до конца
+        транзакции. None, если отзыва в базе уже нет.
+        """
+        return Review.objects.select_for_update().filter(
+            pk=self.pk
+        ).values_list('score', flat=True).first()
+
+    def save(self, *args, **kwargs):
+        # Старая оценка перечитывается под блокировкой строки, поэтому
+        # параллельная правка того же отзыва ждёт фиксации этой и
+        # review_saved сдвигает рейтинг от действительно заменённой оценки.
+        with transaction.atomic():
+            if not self._state.adding:
+                self._loaded_score = self.locked_score()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            score = self.locked_score()
+            if score is None:
+                # Отзыв уже удалён параллельным запросом и вычтен из
+                # рейтинга: review_deleted не должен вычитать его снова.
+                self._already_deleted = True
+            else:
+                self.score = score
+            return super().delete(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Комментарии к отзывам"""
@@ -223,9 +345,45 @@ class Comment(models.Model):
     )
 
     class Meta:
-        ordering = ("-pub_date",)
+        indexes = (
+            models.Index(
+                fields=("review", "-pub_date", "-id"),
+                name="comment_review_feed_idx",
+            ),
+        )
+        ordering = ("-pub_date", "-id")
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
 
     def __str__(self):
         return self.text[:15]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку"""
+
+    subject = models.CharField("Тема", max_length=255)
+    message = models.TextField("Текст")
+    from_email = models.EmailField("Отправитель", max_length=254)
+    recipient = models.EmailField("Получатель", max_length=254)
+    created = models.DateTimeField("Создано", auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    next_attempt_at = models.DateTimeField(
+        "Следующая попытка", null=True, blank=True, default=timezone.now
+    )
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=("sent_at", "next_attempt_at"),
+                name="outbox_pending_idx",
+            ),
+        )
+        ordering = ("id",)
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
@@ -0,0 +1,221 @@
+"""
+Очередь исходящих писем.
+
+Письмо сохраняется в таблицу OutgoingEmail, а отправляет его один из
+режимов EMAIL_OUTBOX_MODE:
+
+- ``worker`` (по умолчанию) — команда ``send_outbox`` в отдельном
+  процессе;
+- ``thread`` — в пуле потоков текущего процесса; фоновый поток
+  (start_poller) раз в EMAIL_OUTBOX_POLL_INTERVAL секунд отправляет
+  отложенные повторы и письма, которые не удалось отправить сразу;
+- ``sync`` — сразу, в том же запросе; в таблицу попадают только
+  письма, которые не удалось отправить.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+from reviews.models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_poller = None
+_poller_lock = threading.Lock()
+_poller_stop = threading.Event()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.EMAIL_OUTBOX_THREADS,
+            thread_name_prefix='outbox',
+        )
+    return _executor
+
+
+def enqueue_email(subject, message, from_email, recipient):
+    if settings.EMAIL_OUTBOX_MODE == 'sync':
+        try:
+            EmailMessage(subject, message, from_email, [recipient]).send()
+            return None
+        except Exception as error:
+            # Письмо не потеряется: его повторит send_outbox.
+            return OutgoingEmail.objects.create(
+                subject=subject,
+                message=message,
+                from_email=from_email,
+                recipient=recipient,
+                attempts=1,
+                next_attempt_at=timezone.now() + retry_delay(1),
+                last_error=str(error),
+            )
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        message=message,
+        from_email=from_email,
+        recipient=recipient,
+    )
+    if settings.EMAIL_OUTBOX_MODE == 'thread':
+        start_poller()
+        transaction.on_commit(
+            lambda: get_executor().submit(send_in_thread, [email.pk])
+        )
+    return email
+
+
+def send_in_thread(ids):
+    try:
+        send_pending(ids=ids)
+    finally:
+        connections.close_all()
+
+
+def start_poller():
+    """
+    Запускает в режиме ``thread`` фоновый поток очереди, если он ещё не
+    запущен. Вызывается при постановке письма в очередь и при старте
+    сервера (wsgi.py, asgi.py), чтобы письма, оставшиеся в очереди после
+    перезапуска, тоже были отправлены.
+    """
+    global _poller
+    if settings.EMAIL_OUTBOX_MODE != 'thread':
+        return None
+    with _poller_lock:
+        if _poller is None or not _poller.is_alive():
+            _poller_stop.clear()
+            _poller = threading.Thread(
+                target=run_poller, name='outbox-poller', daemon=True
+            )
+            _poller.start()
+    return _poller
+
+
+def stop_poller():
+    _poller_stop.set()
+    if _poller is not None:
+        _poller.join()
+
+
+def run_poller():
+    while not _poller_stop.wait(settings.EMAIL_OUTBOX_POLL_INTERVAL):
+        try:
+            send_due()
+        except Exception:
+            logger.exception('Не удалось отправить письма из очереди')
+        finally:
+            connections.close_all()
+
+
+def send_due(batch_size=None):
+    """
+    Отправляет все готовые к отправке письма пачками по batch_size,
+    каждую через одно соединение. Возвращает пару (отправлено, с ошибкой).
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_pending(batch_size=batch_size)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_pending(batch_size=None, ids=None):
+    """
+    Забирает пачку готовых к отправке писем.
+
+    Строки блокируются только на время короткой транзакции: вместо
+    блокировки письму выдаётся аренда — next_attempt_at переносится на
+    EMAIL_OUTBOX_LEASE секунд вперёд, и другие обработчики его не берут.
+    Если процесс упадёт во время отправки, письмо вернётся в очередь,
+    когда аренда истечёт.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = OutgoingEmail.objects.select_for_update(
+            skip_locked=True
+        ).filter(sent_at__isnull=True, next_attempt_at__lte=now)
+        if ids is not None:
+            pending = pending.filter(pk__in=ids)
+        emails = list(
+            pending[:batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(next_attempt_at=now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_LEASE
+        ))
+    return emails
+
+
+def mark_failed(email, error, now):
+    email.attempts += 1
+    email.last_error = str(error)
+    email.next_attempt_at = (
+        now + retry_delay(email.attempts)
+        if email.attempts < settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        else None
+    )
+
+
+def send_pending(batch_size=None, ids=None):
+    """
+    Отправляет пачку готовых к отправке писем через одно соединение.
+
+    Сетевой обмен идёт вне транзакции. Если соединение не удалось
+    открыть или оно оборвалось, попытка записывается всем письмам
+    пачки, которые ещё не были отправлены.
+
+    Возвращает пару (отправлено, с ошибкой).
+    """
+    emails = claim_pending(batch_size=batch_size, ids=ids)
+    if not emails:
+        return 0, 0
+
+    now = timezone.now()
+    sent, failed = [], []
+    try:
+        with get_connection() as connection:
+            for email in emails:
+                try:
+                    EmailMessage(
+                        subject=email.subject,
+                        body=email.message,
+                        from_email=email.from_email,
+                        to=[email.recipient],
+                        connection=connection,
+                    ).send()
+                except Exception as error:
+                    mark_failed(email, error, now)
+                    failed.append(email)
+                else:
+                    email.attempts += 1
+                    email.sent_at = now
+                    sent.append(email)
+    except Exception as error:
+        done = {email.pk for email in sent + failed}
+        for email in emails:
+            if email.pk not in done:
+                mark_failed(email, error, now)
+                failed.append(email)
+    OutgoingEmail.objects.bulk_update(
+        sent + failed,
+        ('attempts', 'sent_at', 'next_attempt_at', 'last_error'),
+    )
+    return len(sent), len(failed)
@@ -0,0 +1,173 @@
+"""
+Полнотекстовый поиск по названиям произведений, жанров и категорий.
+
+Бэкенд выбирается по настройке SEARCH_BACKEND (путь к классу), а если
+она не задана — по типу базы данных: на SQLite используется виртуальная
+таблица FTS5, на PostgreSQL — триграммные GIN-индексы.
+"""
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+from reviews.models import Category, Genre, Title
+
+SEARCH_MODELS = (Title, Genre, Category)
+SEARCH_FIELD = 'name'
+
+
+class LikeSearchBackend:
+    """Запасной бэкенд: поиск подстроки без индекса."""
+
+    def setup(self):
+        pass
+
+    def index(self, instance):
+        pass
+
+    def remove(self, instance):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def search(self, queryset, query):
+        return queryset.filter(**{f'{SEARCH_FIELD}__icontains': query})
+
+
+class SQLiteSearchBackend(LikeSearchBackend):
+    """
+    Индекс в виртуальной таблице FTS5.
+
+    Таблица не описана моделью, поэтому её строки обновляются сигналами
+    при сохранении и удалении объектов.
+    """
+
+    table = 'reviews_search_index'
+
+    def setup(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5('
+                'kind UNINDEXED, object_id UNINDEXED, text, '
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+    def index(self, instance):
+        self.remove(instance)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (kind, object_id, text) '
+                'VALUES (%s, %s, %s)',
+                (
+                    instance._meta.label_lower,
+                    instance.pk,
+                    getattr(instance, SEARCH_FIELD),
+                ),
+            )
+
+    def remove(self, instance):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} '
+                'WHERE kind = %s AND object_id = %s',
+                (instance._meta.label_lower, instance.pk),
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+            for model in SEARCH_MODELS:
+                cursor.execute(
+                    f'INSERT INTO {self.table} (kind, object_id, text) '
+                    f'SELECT %s, id, {SEARCH_FIELD} '
+                    f'FROM {model._meta.db_table}',
+                    (model._meta.label_lower,),
+                )
+
+    def search(self, queryset, query):
+        match = ' '.join(
+            '"{}"*'.format(token.replace('"', '""'))
+            for token in query.split()
+        )
+        if not match:
+            return queryset
+        # Индекс присоединяется к уже отфильтрованному queryset, поэтому
+        # фильтры, сортировка по релевантности и LIMIT пагинатора
+        # выполняются одним запросом по всем совпадениям.
+        opts = queryset.model._meta
+        return queryset.extra(
+            tables=[self.table],
+            where=[
+                f'{self.table} MATCH %s',
+                f'{self.table}.kind = %s',
+                f'{self.table}.object_id = {opts.db_table}.{opts.pk.column}',
+            ],
+            params=[f'text : ({match})', opts.label_lower],
+            select={'search_rank': f'{self.table}.rank'},
+            order_by=['search_rank', 'pk'],
+        )
+
+
+class PostgresSearchBackend(LikeSearchBackend):
+    """
+    Поиск по сходству запроса со словами названия (расширение pg_trgm).
+
+    Запрос сравнивается не со всем названием, а с самым похожим на него
+    участком (оператор %>, функция word_similarity), поэтому начало
+    одного слова находит многословное название, как и префиксный поиск
+    FTS5 на SQLite. GIN-индексы строятся по самим колонкам, поэтому
+    PostgreSQL обновляет их сам и синхронизировать ничего не нужно.
+    Условие поиска добавляется к отфильтрованному queryset, а ограничивает
+    выдачу только пагинатор.
+    """
+
+    def __init__(self):
+        from django.contrib.postgres.lookups import PostgresSimpleLookup
+        from django.db.models import CharField
+
+        class TrigramWordSimilar(PostgresSimpleLookup):
+            lookup_name = 'trigram_word_similar'
+            operator = '%%>'
+
+        CharField.register_lookup(TrigramWordSimilar)
+
+    def setup(self):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            for model in SEARCH_MODELS:
+                table = model._meta.db_table
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {table}_{SEARCH_FIELD}_trgm '
+                    f'ON {table} USING gin ({SEARCH_FIELD} gin_trgm_ops)'
+                )
+
+    def search(self, queryset, query):
+        from django.db.models import F, FloatField, Func, Value
+
+        return queryset.filter(
+            **{f'{SEARCH_FIELD}__trigram_word_similar': query}
+        ).annotate(search_rank=Func(
+            Value(query), F(SEARCH_FIELD),
+            function='WORD_SIMILARITY', output_field=FloatField(),
+        )).order_by('-search_rank', 'pk')
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        backend_path = getattr(settings, 'SEARCH_BACKEND', None)
+        if backend_path:
+            backend_class = import_string(backend_path)
+        else:
+            backend_class = VENDOR_BACKENDS.get(
+                connection.vendor, LikeSearchBackend
+            )
+        _backend = backend_class()
+    return _backend
@@ -0,0 +1,96 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Comment, Review, Title, histogram_field
+from reviews.search import get_search_backend
+
+
+def bayesian_rating(score_sum, reviews_count):
+    """
+    Выражение взвешенного рейтинга: к отзывам добавляется
+    RATING_PRIOR_WEIGHT воображаемых оценок RATING_PRIOR_SCORE.
+    """
+    weight = settings.RATING_PRIOR_WEIGHT
+    return (
+        (Cast(score_sum, FloatField()) + settings.RATING_PRIOR_SCORE * weight)
+        / NullIf(reviews_count + weight, 0)
+    )
+
+
+def update_title_rating(title_id, added=(), removed=()):
+    """
+    Учитывает в рейтинге и гистограмме произведения добавленные
+    и удалённые оценки и увеличивает версию его отзывов.
+
+    Всё считается одним UPDATE по F-выражениям, поэтому параллельные
+    запросы не затирают изменения друг друга.
+    """
+    histogram = Counter(added)
+    histogram.subtract(removed)
+    score_sum = F('score_sum') + sum(added) - sum(removed)
+    reviews_count = F('reviews_count') + len(added) - len(removed)
+    Title.objects.filter(pk=title_id).update(
+        score_sum=score_sum,
+        reviews_count=reviews_count,
+        rating=(
+            Cast(score_sum, FloatField())
+            / NullIf(reviews_count, 0)
+        ),
+        weighted_rating=bayesian_rating(score_sum, reviews_count),
+        reviews_version=F('reviews_version') + 1,
+        **{
+            histogram_field(score): F(histogram_field(score)) + delta
+            for score, delta in histogram.items() if delta
+        },
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        update_title_rating(instance.title_id, added=(instance.score,))
+    elif getattr(instance, '_loaded_score', None) is None:
+        update_title_rating(instance.title_id)
+    else:
+        update_title_rating(
+            instance.title_id,
+            added=(instance.score,),
+            removed=(instance._loaded_score,),
+        )
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    if getattr(instance, '_already_deleted', False):
+        return
+    update_title_rating(instance.title_id, removed=(instance.score,))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    Title.objects.filter(reviews=instance.review_id).update(
+        reviews_version=F('reviews_version') + 1
+    )
+
+
+def setup_search(**kwargs):
+    backend = get_search_backend()
+    backend.setup()
+    backend.rebuild()
+
+
+def search_object_saved(sender, instance, **kwargs):
+    get_search_backend().index(instance)
+
+
+def search_object_deleted(sender, instance, **kwargs):
+    get_search_backend().remove(instance)
@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+
+        create_single_review(admin_client, titles[0]['id'], 'first', 2)
+        response = create_single_review(
+            user_client, titles[0]['id'], 'second', 7
+        )
+        review_id = response.json()['id']
+        assert admin_client.get(title_url).json()['rating'] == 4.5, (
+            'Рейтинг произведения должен пересчитываться при создании отзыва.'
+        )
+
+        response = user_client.patch(
+            f'{reviews_url}{review_id}/', data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(title_url).json()['rating'] == 6, (
+            'Рейтинг произведения должен пересчитываться при изменении '
+            'оценки в отзыве.'
+        )
+
+        response = user_client.delete(f'{reviews_url}{review_id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(title_url).json()['rating'] == 2, (
+            'Рейтинг произведения должен пересчитываться при удалении отзыва.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'text', 8)
+        Title.objects.update(rating=None, reviews_count=0, score_sum=0)
+
+        call_command('recalculate_ratings')
+
+        first, second = (
+            Title.objects.get(pk=titles[0]['id']),
+            Title.objects.get(pk=titles[1]['id']),
+        )
+        assert (first.rating, first.reviews_count, first.score_sum) == (
+            8, 1, 8
+        ), 'Команда `recalculate_ratings` должна восстанавливать рейтинг.'
+        assert (second.rating, second.reviews_count, second.score_sum) == (
+            None, 0, 0
+        ), 'Произведение без отзывов должно остаться без рейтинга.'
+
+    def test_03_stale_concurrent_edits(self, admin_client):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        review_id = create_single_review(
+            admin_client, titles[0]['id'], 'text', 8
+        ).json()['id']
+        first, second = (
+            Review.objects.get(pk=review_id), Review.objects.get(pk=review_id)
+        )
+        first.score = 2
+        first.save()
+        second.score = 5
+        second.save()
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating, title.reviews_count, title.score_sum) == (
+            5, 1, 5
+        ), (
+            'Изменение оценки должно учитываться от оценки в базе, '
+            'а не от загруженной раньше параллельной правки.'
+        )
+        assert (title.score_2_count, title.score_5_count,
+                title.score_8_count) == (0, 1, 0)
+
+        first.delete()
+        second.delete()
+        title.refresh_from_db()
+        assert (title.reviews_count, title.score_sum) == (0, 0), (
+            'Повторное удаление отзыва не должно вычитаться из рейтинга.'
+        )
+
+    def test_04_recalculate_invalidates_cache(self, admin_client, client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'text', 8)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        Title.objects.update(rating=0)
+        etag = client.get(url)['ETag']
+
+        call_command('recalculate_ratings')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'После `recalculate_ratings` кэш каталога должен сбрасываться.'
+        )
+        assert response.json()['rating'] == 8
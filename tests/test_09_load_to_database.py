@@ -0,0 +1,80 @@
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09LoadToDatabase:
+
+    def test_01_load_all_tables(self):
+        from reviews.models import Comment, Review, Title, User
+
+        call_command('load_to_database', batch_size=7)
+
+        assert User.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert Title.genre.through.objects.count() == 42, (
+            'Команда `load_to_database` должна загружать связи произведений '
+            'с жанрами из `genre_title.csv`.'
+        )
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Команда `load_to_database` должна сохранять дату публикации '
+            'из файла.'
+        )
+        title = Title.objects.get(pk=review.title_id)
+        assert title.reviews_count == title.reviews.count()
+
+    def test_02_truncate_and_only(self):
+        from reviews.models import Category, Genre
+
+        call_command('load_to_database', only=['category', 'genre'])
+        call_command(
+            'load_to_database', only=['category'], truncate=True
+        )
+
+        assert Category.objects.count() == 3
+        assert Genre.objects.count() == 15
+
+    def test_03_truncate_without_row_signals(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from reviews.models import Review, Title
+
+        call_command('load_to_database')
+        with CaptureQueriesContext(connection) as queries:
+            call_command('load_to_database', truncate=True)
+        rating_updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(rating_updates) < 10, (
+            '`--truncate` должен очищать таблицы без сигналов по строкам.'
+        )
+        assert Review.objects.count() == 72
+        title = Title.objects.get(pk=Review.objects.first().title_id)
+        assert title.reviews_count == title.reviews.count()
+
+    def test_04_truncate_rolled_back_on_error(self, monkeypatch):
+        from reviews.management.commands.load_to_database import Command
+        from reviews.models import Category, Genre
+
+        call_command('load_to_database', only=['category', 'genre'])
+
+        def broken_load(self, name, *args):
+            if name == 'genre':
+                raise ValueError('битый файл')
+            return load_table(self, name, *args)
+
+        load_table = Command.load_table
+        monkeypatch.setattr(Command, 'load_table', broken_load)
+        with pytest.raises(ValueError):
+            call_command(
+                'load_to_database', only=['category', 'genre'], truncate=True
+            )
+        assert Category.objects.count() == 3
+        assert Genre.objects.count() == 15, (
+            'Если загрузка упала, очищенные `--truncate` таблицы должны '
+            'восстанавливаться откатом транзакции.'
+        )
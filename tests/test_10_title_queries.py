@@ -0,0 +1,37 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleQueries:
+    # COUNT для пагинации, произведения с категориями и жанры.
+    LIST_QUERIES = 3
+    # Произведение с категорией и его жанры.
+    DETAIL_QUERIES = 2
+
+    def test_01_title_list_queries(self, client, admin_client,
+                                   django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(self.LIST_QUERIES):
+            client.get('/api/v1/titles/?limit=1')
+        with django_assert_num_queries(self.LIST_QUERIES):
+            response = client.get(f'/api/v1/titles/?limit={len(titles)}')
+        assert len(response.json()['results']) == len(titles), (
+            'Количество запросов к базе при получении списка произведений '
+            'не должно зависеть от размера страницы.'
+        )
+        title = next(
+            result for result in response.json()['results']
+            if result['id'] == titles[0]['id']
+        )
+        assert title['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert {genre['slug'] for genre in title['genre']} == set(
+            titles[0]['genre']
+        )
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(self.DETAIL_QUERIES):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/')
@@ -0,0 +1,51 @@
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11FeedPagination:
+
+    def test_01_cursor_pagination(self, client, admin_client, admin,
+                                  user_client, user, moderator_client,
+                                  moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        urls = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/',
+        )
+        for url, objects in zip(urls, (reviews, comments)):
+            response = client.get(f'{url}?cursor=&limit=2')
+            data = response.json()
+            assert 'count' not in data, (
+                f'Курсорная пагинация `{url}` не должна считать COUNT(*) '
+                'без параметра `count=true`.'
+            )
+            assert data['previous'] is None
+            assert len(data['results']) == 2
+            received = [obj['id'] for obj in data['results']]
+
+            data = client.get(data['next']).json()
+            received += [obj['id'] for obj in data['results']]
+            assert data['next'] is None
+            assert received == sorted(
+                (obj['id'] for obj in objects), reverse=True
+            ), (
+                f'Курсорная пагинация `{url}` должна отдавать все объекты '
+                'от новых к старым без повторов.'
+            )
+
+            data = client.get(f'{url}?cursor=&count=true').json()
+            assert data['count'] == len(objects)
+
+            data = client.get(url).json()
+            assert data['count'] == len(objects), (
+                f'Без параметра `cursor` пагинация `{url}` должна остаться '
+                'limit/offset.'
+            )
@@ -0,0 +1,40 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12BenchmarkApi:
+
+    def test_01_benchmark_reports_endpoints(self, capsys):
+        call_command(
+            'benchmark_api', seed=True, titles=5, users=3,
+            reviews_per_title=2, comments_per_review=1, repeat=2,
+            drop_indexes=True,
+        )
+        output = capsys.readouterr().out
+        for url in ('/api/v1/titles/', '/reviews/', '/comments/'):
+            assert url in output
+        assert 'с индексами' in output
+        assert 'без индексов' in output
+        top = output.split('/api/v1/titles/top/', 1)[1].split('/api/v1/', 1)[0]
+        assert 'SELECT "reviews_title"' in top, (
+            'Эндпоинты каталога должны замеряться без кэша ответов, '
+            'с планами их запросов.'
+        )
+
+    def test_02_indexes_kept_without_flag(self, capsys):
+        from reviews.models import Title
+
+        call_command('benchmark_api', seed=True, titles=2, users=2,
+                     reviews_per_title=1, comments_per_review=0, repeat=1)
+        output = capsys.readouterr().out
+        assert 'без индексов' not in output.replace(
+            'Замер без индексов пропущен', ''
+        ), 'Без --drop-indexes индексы удалять нельзя.'
+        assert 'с индексами' in output
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(
+                cursor, Title._meta.db_table
+            )
+        assert 'title_year_idx' in indexes
@@ -0,0 +1,70 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Search:
+
+    def test_01_title_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?search=Крепк')
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id']
+        ], (
+            'Проверьте, что GET-запрос к `/api/v1/titles/?search=<name>` '
+            'находит произведения по началу слова в названии.'
+        )
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            data={'name': 'Поезд', 'category': 'books', 'genre': ['drama']},
+        )
+        assert client.get(
+            '/api/v1/titles/?search=Крепк'
+        ).json()['results'] == [], (
+            'Поисковый индекс должен обновляться при изменении произведения.'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert client.get(
+            '/api/v1/titles/?search=Терминатор'
+        ).json()['results'] == [], (
+            'Поисковый индекс должен обновляться при удалении произведения.'
+        )
+
+    def test_02_genre_and_category_search(self, client, admin_client):
+        create_titles(admin_client)
+        data = client.get('/api/v1/genres/?search=ком').json()
+        assert [genre['slug'] for genre in data['results']] == ['comedy']
+        data = client.get('/api/v1/categories/?search=книг').json()
+        assert [category['slug'] for category in data['results']] == [
+            'books'
+        ]
+
+    def test_03_search_with_filters_and_pages(self, client, admin_client):
+        from reviews.models import Category, Title
+        from reviews.search import get_search_backend
+
+        _, categories, _ = create_titles(admin_client)
+        category = Category.objects.get(slug=categories[1]['slug'])
+        Title.objects.bulk_create(
+            Title(name=f'Терминатор {number}', year=2000, category=category)
+            for number in range(120)
+        )
+        get_search_backend().rebuild()
+
+        data = client.get('/api/v1/titles/?search=Терминатор').json()
+        assert data['count'] == 121, (
+            'Поиск не должен ограничивать число совпадений: '
+            'выдачу ограничивает только пагинатор.'
+        )
+        data = client.get(
+            '/api/v1/titles/?search=Терминатор'
+            f'&category={categories[0]["slug"]}'
+        ).json()
+        assert data['count'] == 1, (
+            'Фильтры должны применяться вместе с поиском, '
+            'а не к первым найденным совпадениям.'
+        )
@@ -0,0 +1,30 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleFilters:
+
+    def test_01_slug_filters(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        data = client.get(f'{url}?genre=horror,comedy,drama').json()
+        ids = [title['id'] for title in data['results']]
+        assert sorted(ids) == sorted(title['id'] for title in titles), (
+            f'Проверьте, что `{url}?genre=<slug>,<slug>` возвращает '
+            'произведения любого из жанров без повторов.'
+        )
+
+        data = client.get(f'{url}?genre=horr').json()
+        assert data['results'] == [], (
+            'Фильтр по жанру должен сравнивать slug целиком.'
+        )
+
+        data = client.get(f'{url}?category=films,books').json()
+        assert data['count'] == len(titles)
+        data = client.get(f'{url}?category=books').json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id']
+        ]
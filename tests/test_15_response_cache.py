@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ResponseCache:
+
+    def test_01_cached_catalog(self, client, admin_client,
+                               django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response['ETag']
+        with django_assert_num_queries(0):
+            cached = client.get(url)
+        assert cached.json() == response.json(), (
+            'Повторный GET-запрос к каталогу должен отдаваться из кэша.'
+        )
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        create_single_review(admin_client, titles[0]['id'], 'text', 9)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Новый отзыв меняет рейтинг и должен сбрасывать кэш произведений.'
+        )
+        assert response.json()['rating'] == 9
+
+        admin_client.delete('/api/v1/genres/drama/')
+        data = client.get('/api/v1/genres/').json()
+        assert 'drama' not in [genre['slug'] for genre in data['results']]
+
+    def test_02_invalidate_after_commit(self):
+        from api.cache import get_catalog_version
+        from django.db import transaction
+        from reviews.models import Genre
+
+        version = get_catalog_version()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                Genre.objects.create(name='Откат', slug='rollback')
+                raise RuntimeError
+        assert get_catalog_version() == version, (
+            'Откат транзакции не должен сбрасывать кэш каталога.'
+        )
+
+        with transaction.atomic():
+            Genre.objects.create(name='Фиксация', slug='commit')
+            assert get_catalog_version() == version, (
+                'Версия каталога должна меняться только после фиксации '
+                'транзакции.'
+            )
+        assert get_catalog_version() != version
+
+    def test_03_version_shared_between_processes(self, settings):
+        from api.cache import (VERSION_KEY, get_cache, get_catalog_version,
+                               invalidate_catalog)
+        from django.core.cache import caches
+
+        invalidate_catalog()
+        version = get_catalog_version()
+        # Локальный кэш другого процесса версию не видит и не хранит.
+        get_cache().clear()
+        assert get_catalog_version() == version, (
+            'Версия каталога должна храниться в общем для процессов кэше.'
+        )
+        version_cache = caches[settings.CATALOG_VERSION_CACHE_ALIAS]
+        version_cache.delete(VERSION_KEY)
+        assert get_catalog_version() != version, (
+            'После истечения версии ETag ответов должен меняться.'
+        )
+
+    def test_04_fast_delete_kept(self):
+        from django.db.models.deletion import Collector
+        from reviews.models import OutgoingEmail
+
+        assert Collector(using='default').can_fast_delete(
+            OutgoingEmail.objects.all()
+        ), (
+            'Приёмники post_delete должны быть подключены только к своим '
+            'моделям, иначе Django не может удалять строки одним запросом.'
+        )
@@ -0,0 +1,52 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConditionalGet:
+
+    def test_01_reviews_and_comments(self, client, admin_client, admin,
+                                     user_client, user,
+                                     django_assert_max_num_queries):
+        author_map = {admin: admin_client, user: user_client}
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        urls = (
+            reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/',
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+            f'{reviews_url}{reviews[0]["id"]}/comments/{comments[0]["id"]}/',
+        )
+        etags = {}
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            etags[url] = response['ETag']
+            with django_assert_max_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'GET-запрос к `{url}` с актуальным ETag должен возвращать '
+                '304 без загрузки данных.'
+            )
+
+        user_client.patch(
+            f'{reviews_url}{reviews[1]["id"]}/', data={'text': 'new text'}
+        )
+        for url in urls[:2]:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Изменение отзыва должно менять ETag `{url}`.'
+            )
+            etags[url] = response['ETag']
+
+        user_client.delete(
+            f'{reviews_url}{reviews[0]["id"]}/comments/{comments[1]["id"]}/'
+        )
+        response = client.get(urls[2], HTTP_IF_NONE_MATCH=etags[urls[2]])
+        assert response.status_code == HTTPStatus.OK, (
+            'Удаление комментария должно менять ETag ленты комментариев.'
+        )
+        assert len(response.json()['results']) == 1
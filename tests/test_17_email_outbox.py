@@ -0,0 +1,143 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+    valid_data = {'email': 'outbox@yamdb.fake', 'username': 'outbox_user'}
+
+    def test_01_worker_mode(self, client, settings):
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        outbox_before_count = len(mail.outbox)
+
+        response = client.post(self.url_signup, data=self.valid_data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'В режиме `worker` signup должен только ставить письмо в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(sent_at__isnull=True).count() == 1
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == [self.valid_data['email']]
+        assert not OutgoingEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_02_retry_with_backoff(self, client, settings, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+        from reviews.models import OutgoingEmail
+
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        client.post(self.url_signup, data=self.valid_data)
+
+        def broken_send(self, messages):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', broken_send)
+        call_command('send_outbox')
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1
+        assert email.sent_at is None
+        assert email.next_attempt_at > email.created, (
+            'После ошибки отправки письмо должно быть отложено.'
+        )
+        assert 'SMTP' in email.last_error
+
+        OutgoingEmail.objects.update(next_attempt_at=email.created)
+        call_command('send_outbox')
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.next_attempt_at is None, (
+            'После EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо больше не '
+            'отправляется.'
+        )
+
+    def test_03_connection_failure(self, client, settings, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+        from reviews.models import OutgoingEmail
+
+        client.post(self.url_signup, data=self.valid_data)
+        assert OutgoingEmail.objects.filter(sent_at__isnull=True).count() == 1, (
+            'По умолчанию signup должен только ставить письмо в очередь.'
+        )
+
+        def refused(self):
+            raise ConnectionRefusedError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailBackend, 'open', refused)
+        call_command('send_outbox')
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1, (
+            'Ошибка соединения должна засчитываться как попытка отправки.'
+        )
+        assert email.sent_at is None
+        assert email.next_attempt_at > email.created
+        assert 'SMTP' in email.last_error
+
+    @staticmethod
+    def wait_for(condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def test_04_thread_mode(self, client, settings):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import stop_poller
+
+        settings.EMAIL_OUTBOX_MODE = 'thread'
+        outbox_before_count = len(mail.outbox)
+        try:
+            response = client.post(self.url_signup, data=self.valid_data)
+            assert response.status_code == HTTPStatus.OK
+            assert self.wait_for(
+                lambda: len(mail.outbox) > outbox_before_count
+            ), 'В режиме `thread` письмо должно отправляться в фоне.'
+            assert mail.outbox[-1].to == [self.valid_data['email']]
+            assert self.wait_for(lambda: not OutgoingEmail.objects.filter(
+                sent_at__isnull=True
+            ).exists())
+        finally:
+            stop_poller()
+
+    def test_05_thread_mode_retries(self, client, settings, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import stop_poller
+
+        settings.EMAIL_OUTBOX_MODE = 'thread'
+        settings.EMAIL_OUTBOX_POLL_INTERVAL = 0.05
+        outbox_before_count = len(mail.outbox)
+
+        def refused(self):
+            raise ConnectionRefusedError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailBackend, 'open', refused)
+        try:
+            client.post(self.url_signup, data=self.valid_data)
+            assert self.wait_for(lambda: OutgoingEmail.objects.filter(
+                attempts=1
+            ).exists()), 'Неудачная отправка должна записываться в очередь.'
+            monkeypatch.undo()
+            OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+            assert self.wait_for(
+                lambda: len(mail.outbox) > outbox_before_count
+            ), (
+                'В режиме `thread` фоновый поток должен повторять '
+                'отложенные письма.'
+            )
+            assert self.wait_for(lambda: OutgoingEmail.objects.filter(
+                sent_at__isnull=False
+            ).exists())
+        finally:
+            stop_poller()
@@ -0,0 +1,57 @@
+import re
+import time
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ConfirmationCode:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+    valid_data = {'email': 'code@yamdb.fake', 'username': 'code_user'}
+
+    def get_code(self, client):
+        client.post(self.url_signup, data=self.valid_data)
+        call_command('send_outbox')
+        return re.match(r'(\S+) - ', mail.outbox[-1].body).group(1)
+
+    def test_01_code_from_email(self, client, django_assert_num_queries):
+        code = self.get_code(client)
+        with django_assert_num_queries(1):
+            response = client.post(self.url_token, data={
+                'username': self.valid_data['username'],
+                'confirmation_code': code,
+            })
+        assert response.status_code == HTTPStatus.OK, (
+            'Код из письма должен обмениваться на токен одним запросом к базе.'
+        )
+        assert 'token' in response.json()
+
+    def test_02_expired_and_foreign_code(self, client, django_user_model,
+                                         settings, monkeypatch):
+        code = self.get_code(client)
+        django_user_model.objects.create_user(
+            username='other_user', email='other@yamdb.fake'
+        )
+        response = client.post(self.url_token, data={
+            'username': 'other_user', 'confirmation_code': code,
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Код подтверждения должен подходить только своему пользователю.'
+        )
+
+        now = time.time()
+        monkeypatch.setattr(
+            time, 'time',
+            lambda: now + settings.CONFIRMATION_CODE_TIMEOUT + 1
+        )
+        response = client.post(self.url_token, data={
+            'username': self.valid_data['username'],
+            'confirmation_code': code,
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Просроченный код подтверждения должен отклоняться.'
+        )
@@ -0,0 +1,46 @@
+from http import HTTPStatus
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19CachedAuthentication:
+
+    def test_01_no_auth_query(self, user_client, django_assert_num_queries):
+        user_client.get('/api/v1/genres/')
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/genres/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Повторный авторизованный GET-запрос не должен читать '
+            'пользователя из базы.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client, user,
+                                              user_client):
+        url = '/api/v1/genres/'
+        data = {'name': 'Драма', 'slug': 'drama'}
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Смена роли должна сбрасывать кэш аутентификации.'
+        )
+
+    def test_03_embedded_claims(self, admin, settings,
+                                django_assert_num_queries):
+        from api.authentication import (CachedJWTAuthentication,
+                                        make_access_token)
+        from django.core.cache import cache
+
+        settings.JWT_EMBED_USER_CLAIMS = True
+        token = make_access_token(admin)
+        cache.clear()
+        with django_assert_num_queries(0):
+            user = CachedJWTAuthentication().get_user(token)
+        assert (user.pk, user.username, user.is_admin) == (
+            admin.pk, admin.username, True
+        ), 'Роль из токена должна использоваться без запроса к базе.'
@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ReviewCreate:
+
+    def test_01_single_insert_and_duplicate(self, admin_client, user_client):
+        from reviews.errors import ErrorMesage
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'text', 'score': 5}
+        user_client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED
+        review_queries = [
+            query['sql'] for query in queries.captured_queries
+            if '"reviews_review"' in query['sql']
+        ]
+        assert len(review_queries) == 1, (
+            'Создание отзыва должно обходиться одним INSERT без '
+            'предварительной проверки EXISTS.'
+        )
+        title_selects = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_title"' in query['sql']
+        ]
+        assert len(title_selects) == 1, (
+            'Произведение должно загружаться один раз за запрос.'
+        )
+
+        response = user_client.post(url, data=data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert response.json() == {
+            'non_field_errors': [ErrorMesage.ONLY_ONE_REVIEW]
+        }
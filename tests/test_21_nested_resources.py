@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21NestedResources:
+
+    def test_01_review_must_belong_to_title(self, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = (
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Комментарии должны быть доступны только по URL произведения, '
+            'к которому относится отзыв.'
+        )
+        response = admin_client.post(url, data={'text': 'text'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_single_parent_lookup(self, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        for method, kwargs in (('get', {}), ('post', {'text': 'text'})):
+            with CaptureQueriesContext(connection) as queries:
+                response = getattr(admin_client, method)(url, data=kwargs)
+            assert response.status_code in (HTTPStatus.OK, HTTPStatus.CREATED)
+            parent_queries = [
+                query['sql'] for query in queries.captured_queries
+                if query['sql'].startswith('SELECT')
+                and 'FROM "reviews_review"' in query['sql']
+            ]
+            assert len(parent_queries) == 1, (
+                'Отзыв и произведение должны загружаться одним запросом.'
+            )
+            assert 'JOIN "reviews_title"' in parent_queries[0]
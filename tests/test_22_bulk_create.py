@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22BulkCreate:
+
+    def test_01_titles(self, admin_client, user_client):
+        _, categories, genres = create_titles(admin_client)
+        data = [
+            {
+                'name': f'Произведение {i}',
+                'year': 2000 + i,
+                'genre': [genres[0]['slug'], genres[1]['slug']],
+                'category': categories[0]['slug'],
+                'description': 'описание',
+            }
+            for i in range(3)
+        ]
+        url = '/api/v1/titles/bulk/'
+        response = user_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        results = response.json()
+        assert [result['status'] for result in results] == [201] * 3
+        for result, item in zip(results, data):
+            created = admin_client.get(
+                f'/api/v1/titles/{result["data"]["id"]}/'
+            ).json()
+            assert created['name'] == item['name']
+            assert created == result['data'], (
+                'Ответ массового создания должен совпадать с данными '
+                'созданного произведения.'
+            )
+        found = admin_client.get('/api/v1/titles/?search=Произведение')
+        assert len(found.json()['results']) == 3, (
+            'Созданные пачкой произведения должны попадать в поиск.'
+        )
+
+        data[0]['genre'] = ['unknown']
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'genre' in response.json()[0]
+        assert admin_client.get('/api/v1/titles/').json()['count'] == 5, (
+            'При ошибке в одном из элементов не должно создаваться ничего.'
+        )
+
+    def test_02_reviews_update_rating(self, admin_client, user_client,
+                                      moderator):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        url = f'{title_url}reviews/bulk/'
+        data = [
+            {'text': 'от модератора', 'score': 4, 'author': moderator.username},
+            {'text': 'от администратора', 'score': 10},
+            {'text': 'снова от модератора', 'score': 1,
+             'author': moderator.username},
+            {'text': 'от незнакомца', 'score': 1, 'author': 'nobody'},
+        ]
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            201, 201, 400, 400
+        ]
+        assert results[0]['data']['author'] == moderator.username
+        assert admin_client.get(title_url).json()['rating'] == 7, (
+            'Рейтинг должен учитывать отзывы, созданные пачкой.'
+        )
+
+        response = user_client.post(
+            url,
+            data=[{'text': 'чужой', 'score': 5, 'author': moderator.username}],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()[0]['data']['author'] == 'TestUser', (
+            'Обычный пользователь не может создавать отзывы от чужого имени.'
+        )
+
+    def test_03_comments_and_limits(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review = user_client.post(
+            reviews_url, data={'text': 'text', 'score': 5}
+        ).json()
+        url = f'{reviews_url}{review["id"]}/comments/'
+        etag = user_client.get(url)['ETag']
+
+        response = user_client.post(
+            f'{url}bulk/',
+            data=[{'text': f'комментарий {i}'} for i in range(5)],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        ids = [result['data']['id'] for result in response.json()]
+        assert len(set(ids)) == 5
+        listed = user_client.get(url)
+        assert listed['ETag'] != etag, (
+            'Массовое создание комментариев должно менять версию ленты.'
+        )
+        assert sorted(
+            comment['id'] for comment in listed.json()['results']
+        ) == sorted(ids)
+
+        for data in ([], {'text': 'не список'}):
+            response = user_client.post(f'{url}bulk/', data=data,
+                                        format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_concurrent_duplicate_review(self, admin_client, admin,
+                                            monkeypatch):
+        from api import views
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        bulk_insert = views.bulk_insert
+
+        def racing_bulk_insert(model, objs, **kwargs):
+            # Другой запрос успевает создать отзыв после проверки.
+            Review.objects.create(
+                title_id=titles[0]['id'], author=admin, text='гонка', score=1
+            )
+            return bulk_insert(model, objs, **kwargs)
+
+        monkeypatch.setattr(views, 'bulk_insert', racing_bulk_insert)
+        response = admin_client.post(
+            f'{title_url}reviews/bulk/',
+            data=[{'text': 'пачкой', 'score': 10}],
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Нарушение уникальности при массовом создании должно '
+            'возвращать 400, а не 500.'
+        )
+        assert not Review.objects.exists()
@@ -0,0 +1,66 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Export:
+
+    def test_01_permissions_and_formats(self, admin_client, user_client,
+                                        client):
+        call_command('load_to_database', only=['category', 'genre', 'titles'])
+        url = '/api/v1/export/titles.ndjson'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+        assert admin_client.get(
+            '/api/v1/export/unknown.csv'
+        ).status_code == HTTPStatus.NOT_FOUND
+        assert admin_client.get(
+            '/api/v1/export/titles.xml'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            'Выгрузка должна отдаваться потоком (StreamingHttpResponse).'
+        )
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert len(rows) == 32
+        assert {'id', 'name', 'year', 'category', 'rating'} <= set(rows[0])
+
+    def test_02_csv_round_trip(self, admin_client, tmp_path, monkeypatch):
+        from reviews.management.commands import load_to_database
+        from reviews.models import Comment, Review, Title, User
+
+        call_command('load_to_database')
+        review = Review.objects.get(pk=1)
+        title = Title.objects.get(pk=review.title_id)
+        for name, filename, *_ in load_to_database.TABLES:
+            response = admin_client.get(f'/api/v1/export/{name}.csv')
+            assert response.status_code == HTTPStatus.OK
+            assert response['Content-Disposition'].endswith(
+                f'filename="{filename}"'
+            )
+            (tmp_path / filename).write_bytes(
+                b''.join(response.streaming_content)
+            )
+
+        monkeypatch.setattr(load_to_database, 'DATA_DIR', tmp_path)
+        call_command('load_to_database', truncate=True)
+
+        assert User.objects.count() == 6
+        assert Title.genre.through.objects.count() == 42
+        assert Comment.objects.count() == 3
+        loaded = Review.objects.get(pk=1)
+        assert loaded.pub_date == review.pub_date, (
+            'Даты из выгрузки должны загружаться командой `load_to_database` '
+            'без изменений.'
+        )
+        loaded_title = Title.objects.get(pk=title.pk)
+        assert loaded_title.rating == title.rating
+        assert loaded_title.category_id == title.category_id
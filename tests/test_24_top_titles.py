@@ -0,0 +1,92 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TopTitles:
+
+    def create_reviews(self, title_id, scores):
+        from reviews.models import Review, User
+
+        for idx, score in enumerate(scores):
+            author, _ = User.objects.get_or_create(
+                username=f'top-author-{idx}',
+                email=f'top-author-{idx}@yamdb.fake',
+            )
+            Review.objects.create(
+                title_id=title_id, author=author, text='text', score=score
+            )
+
+    def test_01_bayesian_order_and_filters(self, admin_client, client,
+                                           settings):
+        settings.RATING_PRIOR_SCORE = 5
+        settings.RATING_PRIOR_WEIGHT = 2
+        titles, categories, genres = create_titles(admin_client)
+        self.create_reviews(titles[0]['id'], [10])
+        self.create_reviews(titles[1]['id'], [9, 9, 9, 9, 9, 9])
+
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data] == [
+            titles[1]['id'], titles[0]['id']
+        ], (
+            'Одна высокая оценка не должна поднимать произведение выше '
+            'произведения с многими хорошими оценками.'
+        )
+        assert data[0]['weighted_rating'] == pytest.approx(8)
+        assert data[1]['weighted_rating'] == pytest.approx(20 / 3)
+        assert data[1]['rating'] == 10
+        assert data[0]['reviews_count'] == 6
+
+        response = client.get('/api/v1/titles/top/?min_reviews=2')
+        assert [title['id'] for title in response.json()] == [
+            titles[1]['id']
+        ]
+        response = client.get(
+            f'/api/v1/titles/top/?category={categories[0]["slug"]}'
+        )
+        assert [title['id'] for title in response.json()] == [
+            titles[0]['id']
+        ]
+        response = client.get(
+            f'/api/v1/titles/top/?genre={genres[2]["slug"]}&limit=1'
+        )
+        assert [title['id'] for title in response.json()] == [
+            titles[1]['id']
+        ]
+        response = client.get('/api/v1/titles/top/?limit=1000')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_updates_and_index(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        self.create_reviews(titles[0]['id'], [1])
+        self.create_reviews(titles[1]['id'], [2])
+        url = '/api/v1/titles/top/'
+        assert client.get(url).json()[0]['id'] == titles[1]['id']
+
+        review_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        admin_client.post(review_url, data={'text': 'text', 'score': 10})
+        assert client.get(url).json()[0]['id'] == titles[0]['id'], (
+            'Топ должен обновляться после добавления отзыва.'
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            client.get(f'{url}?min_reviews=1')
+        sql = next(
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "reviews_title"' in query['sql']
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        assert 'title_top_idx' in plan, (
+            'Запрос топа должен читать индекс title_top_idx, '
+            f'а не сортировать таблицу: {plan}'
+        )
+        assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,86 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_single_review, create_titles
+
+
+def empty_histogram(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(1, 11)}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Histogram:
+
+    def test_01_histogram_follows_reviews(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+
+        response = admin_client.get(title_url)
+        assert 'histogram' not in response.json(), (
+            'Гистограмма должна отдаваться только при `?expand=histogram`.'
+        )
+        expanded_url = f'{title_url}?expand=histogram'
+        assert admin_client.get(expanded_url).json()['histogram'] == (
+            empty_histogram()
+        )
+
+        create_single_review(admin_client, titles[0]['id'], 'first', 2)
+        review_id = create_single_review(
+            user_client, titles[0]['id'], 'second', 7
+        ).json()['id']
+        assert admin_client.get(expanded_url).json()['histogram'] == (
+            empty_histogram(s2=1, s7=1)
+        )
+
+        response = user_client.patch(
+            f'{reviews_url}{review_id}/', data={'score': 2}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert admin_client.get(expanded_url).json()['histogram'] == (
+            empty_histogram(s2=2)
+        ), 'Гистограмма должна обновляться при изменении оценки.'
+
+        user_client.delete(f'{reviews_url}{review_id}/')
+        assert admin_client.get(expanded_url).json()['histogram'] == (
+            empty_histogram(s2=1)
+        ), 'Гистограмма должна обновляться при удалении отзыва.'
+
+        response = admin_client.get('/api/v1/titles/?expand=histogram')
+        histograms = {
+            title['id']: title['histogram']
+            for title in response.json()['results']
+        }
+        assert histograms[titles[0]['id']] == empty_histogram(s2=1)
+
+    def test_02_rebuild_command(self):
+        from reviews.models import HISTOGRAM_FIELDS, Review, Title
+
+        call_command('load_to_database')
+        Title.objects.update(**{field: 5 for field in HISTOGRAM_FIELDS})
+        call_command('rebuild_histograms')
+
+        for title in Title.objects.all():
+            scores = list(title.reviews.values_list('score', flat=True))
+            assert [
+                getattr(title, field) for field in HISTOGRAM_FIELDS
+            ] == [scores.count(score) for score in range(1, 11)]
+        assert Review.objects.exists()
+
+    def test_03_rebuild_invalidates_cache(self, admin_client, client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'text', 4)
+        url = f'/api/v1/titles/{titles[0]["id"]}/?expand=histogram'
+        Title.objects.update(score_4_count=0)
+        etag = client.get(url)['ETag']
+
+        call_command('rebuild_histograms')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'После `rebuild_histograms` кэш каталога должен сбрасываться.'
+        )
+        assert response.json()['histogram'] == empty_histogram(s4=1)
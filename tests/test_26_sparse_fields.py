@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+def title_selects(queries):
+    return [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('SELECT')
+        and 'FROM "reviews_title"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SparseFields:
+
+    def test_01_title_fields(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/titles/?fields=id,name,rating')
+        results = response.json()['results']
+        assert {tuple(sorted(title)) for title in results} == {
+            ('id', 'name', 'rating')
+        }, 'Параметр `fields` должен оставлять в ответе только эти поля.'
+        sql = title_selects(queries)[-1]
+        assert '"description"' not in sql, (
+            'Столбцы, не попавшие в `fields`, не должны загружаться.'
+        )
+        assert 'JOIN' not in sql
+        assert not any(
+            'reviews_title_genre' in query['sql']
+            for query in queries.captured_queries
+        ), 'Жанры не должны подгружаться, если их нет в `fields`.'
+
+        response = client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/'
+            '?fields=id,category,genre&expand=histogram'
+        )
+        data = response.json()
+        assert set(data) == {'id', 'category', 'genre', 'histogram'}
+        assert data['category'] == {'name': 'Фильм', 'slug': 'films'}
+        assert {genre['slug'] for genre in data['genre']} == set(
+            titles[0]['genre']
+        )
+        assert data['histogram']['1'] == 0
+
+        response = client.get('/api/v1/titles/?fields=unknown')
+        assert response.json()['results'][0] == {}
+
+    def test_02_review_and_comment_fields(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'text', 5
+        ).json()
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = admin_client.get(f'{reviews_url}?fields=id,score&cursor=')
+        assert response.json()['results'] == [
+            {'id': review['id'], 'score': 5}
+        ]
+        response = admin_client.get(f'{reviews_url}?fields=author')
+        assert response.json()['results'] == [{'author': 'TestUser'}]
+
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        user_client.post(comments_url, data={'text': 'comment'})
+        response = admin_client.get(f'{comments_url}?fields=text')
+        assert response.json()['results'] == [{'text': 'comment'}]
+
+        response = user_client.patch(
+            f'{reviews_url}{review["id"]}/?fields=id',
+            data={'score': 7},
+        )
+        assert response.json()['score'] == 7, (
+            'Параметр `fields` не должен влиять на запросы на запись.'
+        )
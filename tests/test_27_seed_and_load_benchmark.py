@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27SeedAndLoadBenchmark:
+
+    def test_01_seed_synthetic(self):
+        from reviews.models import Comment, Review, Title, User
+
+        call_command(
+            'seed_synthetic', users=20, titles=30, genres=5, categories=3,
+            reviews_per_title=4, comments_per_review=1, batch_size=7,
+        )
+        assert User.objects.count() == 20
+        assert Title.objects.count() == 30
+        assert Title.genre.through.objects.filter(
+            title__isnull=False
+        ).exists()
+        counts = sorted(
+            Title.objects.values_list('reviews_count', flat=True),
+            reverse=True,
+        )
+        assert counts[0] > counts[-1], (
+            'Отзывы должны распределяться по произведениям неравномерно.'
+        )
+        assert sum(counts) == Review.objects.count(), (
+            'После наполнения базы рейтинги должны быть пересчитаны.'
+        )
+        assert Comment.objects.exists()
+        assert Review.objects.dates('pub_date', 'year').count() > 1, (
+            'Даты отзывов должны быть распределены по времени.'
+        )
+
+    def test_02_benchmark_load(self, tmp_path, capsys):
+        from reviews.models import Comment, Review, Title, User
+
+        call_command(
+            'seed_synthetic', users=10, titles=10, reviews_per_title=3,
+        )
+        users = User.objects.count()
+        comments = Comment.objects.count()
+        titles = Title.objects.count()
+        reviews = Review.objects.count()
+        first = tmp_path / 'first.json'
+        call_command(
+            'benchmark_load', requests=3, warmup=1, output=str(first),
+        )
+        report = json.loads(first.read_text(encoding='utf-8'))
+        for name in ('titles', 'title', 'reviews', 'comments', 'signup',
+                     'token', 'comment_create', 'comment_bulk',
+                     'review_create', 'review_update', 'review_delete',
+                     'review_bulk', 'title_create', 'title_update',
+                     'title_delete', 'title_bulk', 'user_create',
+                     'users_me_update'):
+            result = report['endpoints'][name]
+            assert result['errors'] == 0, name
+            assert {'throughput', 'p50', 'p95', 'p99', 'queries'} <= set(
+                result
+            )
+        assert (User.objects.count(), Comment.objects.count(),
+                Title.objects.count(), Review.objects.count()) == (
+            users, comments, titles, reviews
+        ), 'Созданные при замерах объекты должны удаляться.'
+
+        capsys.readouterr()
+        call_command(
+            'benchmark_load', requests=3, warmup=0, only=['titles'],
+            compare=str(first),
+        )
+        output = capsys.readouterr().out
+        assert 'titles' in output
+        assert 'p50 ' in output and '%' in output
@@ -0,0 +1,67 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28FeedQueries:
+    # Произведение, COUNT для пагинации и отзывы вместе с авторами.
+    REVIEW_LIST_QUERIES = 3
+    # Отзыв вместе с произведением, COUNT и комментарии с авторами.
+    COMMENT_LIST_QUERIES = 3
+    # Курсорная пагинация обходится без COUNT.
+    CURSOR_QUERIES = 2
+    AUTHORS = 6
+
+    def create_feed(self, admin_client):
+        from reviews.models import Comment, Review, User
+
+        titles, _, _ = create_titles(admin_client)
+        authors = [
+            User.objects.create(
+                username=f'feed-author-{idx}',
+                email=f'feed-author-{idx}@yamdb.fake',
+            )
+            for idx in range(self.AUTHORS)
+        ]
+        review = None
+        for author in authors:
+            review = Review.objects.create(
+                title_id=titles[0]['id'], author=author, text='text', score=5
+            )
+        for author in authors:
+            Comment.objects.create(review=review, author=author, text='text')
+        return f'/api/v1/titles/{titles[0]["id"]}/reviews/', review
+
+    def test_01_review_list_queries(self, client, admin_client,
+                                    django_assert_num_queries):
+        url, _ = self.create_feed(admin_client)
+        with django_assert_num_queries(self.REVIEW_LIST_QUERIES):
+            client.get(f'{url}?limit=1')
+        with django_assert_num_queries(self.REVIEW_LIST_QUERIES):
+            response = client.get(f'{url}?limit={self.AUTHORS}')
+        authors = {review['author'] for review in response.json()['results']}
+        assert len(authors) == self.AUTHORS, (
+            'Количество запросов к базе при получении списка отзывов '
+            'не должно зависеть от числа авторов на странице.'
+        )
+        with django_assert_num_queries(self.CURSOR_QUERIES):
+            client.get(f'{url}?cursor=&limit={self.AUTHORS}')
+
+    def test_02_comment_list_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        url, review = self.create_feed(admin_client)
+        url = f'{url}{review.id}/comments/'
+        with django_assert_num_queries(self.COMMENT_LIST_QUERIES):
+            client.get(f'{url}?limit=1')
+        with django_assert_num_queries(self.COMMENT_LIST_QUERIES):
+            response = client.get(f'{url}?limit={self.AUTHORS}')
+        authors = {
+            comment['author'] for comment in response.json()['results']
+        }
+        assert len(authors) == self.AUTHORS, (
+            'Количество запросов к базе при получении списка комментариев '
+            'не должно зависеть от числа авторов на странице.'
+        )
+        with django_assert_num_queries(self.CURSOR_QUERIES):
+            client.get(f'{url}?cursor=&limit={self.AUTHORS}')
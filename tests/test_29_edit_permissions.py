@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29EditPermissions:
+
+    def test_01_checker(self, user, moderator, admin):
+        from api.permissions import EditChecker
+        from django.contrib.auth.models import AnonymousUser
+        from reviews.models import Review
+
+        own = Review(author_id=user.id)
+        other = Review(author_id=admin.id)
+        assert EditChecker(user)(own)
+        assert not EditChecker(user)(other)
+        assert EditChecker(moderator)(other)
+        assert EditChecker(admin)(own)
+        assert not EditChecker(AnonymousUser())(own)
+
+    def test_02_can_edit_flags(self, admin_client, user_client,
+                               moderator_client, client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'admin', 5)
+        create_single_review(user_client, titles[0]['id'], 'user', 5)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?expand=can_edit'
+
+        def flags(api_client):
+            return {
+                review['text']: review['can_edit']
+                for review in api_client.get(url).json()['results']
+            }
+
+        assert flags(user_client) == {'admin': False, 'user': True}
+        assert flags(moderator_client) == {'admin': True, 'user': True}
+        assert flags(client) == {'admin': False, 'user': False}
+        assert 'can_edit' not in user_client.get(
+            url.replace('?expand=can_edit', '')
+        ).json()['results'][0]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = user_client.get(f'{url}&fields=id')
+        assert set(response.json()['results'][0]) == {'id', 'can_edit'}
+        assert not any(
+            '"reviews_user"' in query['sql']
+            for query in queries.captured_queries
+        ), 'Флаг `can_edit` должен вычисляться без загрузки авторов.'
+
+    def test_03_object_permission_without_author(self, admin_client,
+                                                 user_client,
+                                                 moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            admin_client, titles[0]['id'], 'admin', 5
+        ).json()
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+        comment = admin_client.post(
+            f'{url}comments/', data={'text': 'comment'}
+        ).json()
+        comment_url = f'{url}comments/{comment["id"]}/'
+
+        user_client.get(url)
+        assert user_client.patch(
+            url, data={'text': 'new'}
+        ).status_code == HTTPStatus.FORBIDDEN
+        assert user_client.delete(
+            comment_url
+        ).status_code == HTTPStatus.FORBIDDEN
+
+        moderator_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = moderator_client.delete(comment_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not any(
+            query['sql'].startswith('SELECT')
+            and 'FROM "reviews_user"' in query['sql']
+            for query in queries.captured_queries
+        ), 'Проверка прав не должна загружать автора отдельным запросом.'
+
+    def test_04_can_edit_etag_per_user(self, admin_client, user_client,
+                                       moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'admin', 5)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/?expand=can_edit'
+
+        user_response = user_client.get(url)
+        moderator_response = moderator_client.get(url)
+        assert user_response['ETag'] != moderator_response['ETag'], (
+            'С `?expand=can_edit` ETag должен зависеть от пользователя.'
+        )
+        assert 'Authorization' in user_response['Vary']
+        response = moderator_client.get(
+            url, HTTP_IF_NONE_MATCH=user_response['ETag']
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'][0]['can_edit'] is True
+        response = user_client.get(
+            url, HTTP_IF_NONE_MATCH=user_response['ETag']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert 'Authorization' in response['Vary']
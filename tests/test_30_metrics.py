@@ -0,0 +1,86 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def registry():
+    from api.metrics import registry
+
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30Metrics:
+
+    def test_01_routes_and_prometheus(self, registry, admin_client,
+                                      user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        registry.reset()
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        client.get('/api/v1/unknown/')
+
+        snapshot = registry.snapshot()
+        titles_list = snapshot['api:titles-list']
+        assert titles_list['request_duration_seconds']['count'] == 2
+        assert titles_list['db_queries']['sum'] > 0
+        assert titles_list['response_size_bytes']['sum'] > 0
+        assert snapshot['api:titles-detail']['db_queries']['count'] == 1
+        assert snapshot['unresolved']['request_duration_seconds'][
+            'count'
+        ] == 1
+
+        assert user_client.get(
+            '/api/v1/metrics/'
+        ).status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.get('/api/v1/metrics/')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert '# TYPE yamdb_request_duration_seconds histogram' in text
+        assert (
+            'yamdb_request_duration_seconds_count{route="api:titles-list"} 2'
+        ) in text
+        assert (
+            'yamdb_db_queries_bucket{route="api:titles-list",le="+Inf"} 2'
+        ) in text
+
+    def test_02_thread_safety(self, registry):
+        def observe(_):
+            for _ in range(1000):
+                registry.observe('route', db_queries=1)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(observe, range(8)))
+        histogram = registry.snapshot()['route']['db_queries']
+        assert histogram['count'] == 8000, (
+            'Гистограммы не должны терять наблюдения при записи из '
+            'нескольких потоков.'
+        )
+        assert histogram['buckets']['1'] == 8000
+        assert histogram['buckets']['0'] == 0
+
+    def test_03_jsonl_dump(self, registry, client, settings, tmp_path):
+        path = tmp_path / 'metrics.jsonl'
+        settings.METRICS_DUMP_PATH = str(path)
+        settings.METRICS_DUMP_INTERVAL = 0
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        lines = path.read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 2
+        dump = json.loads(lines[-1])
+        assert dump['routes']['api:genres-list'][
+            'request_duration_seconds'
+        ]['count'] == 2
+
+        settings.METRICS_DUMP_INTERVAL = 3600
+        client.get('/api/v1/genres/')
+        assert len(path.read_text(encoding='utf-8').splitlines()) == 2
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31SlowQueries:
+
+    def test_01_records_and_summary(self, admin_client, client, settings,
+                                    tmp_path, capsys):
+        titles, _, genres = create_titles(admin_client)
+        path = tmp_path / 'slow.log'
+        settings.SLOW_QUERY_LOG_PATH = str(path)
+        settings.SLOW_QUERY_THRESHOLD = 0
+        client.get(f'/api/v1/titles/?genre={genres[0]["slug"]}')
+        client.get(f'/api/v1/titles/?genre={genres[1]["slug"]}')
+
+        records = [
+            json.loads(line)
+            for line in path.read_text(encoding='utf-8').splitlines()
+        ]
+        assert records, 'Запросы дольше порога должны записываться в журнал.'
+        record = next(
+            record for record in records
+            if 'reviews_genre' in record['sql']
+        )
+        assert record['route'] == 'api:titles-list'
+        assert record['view'] == 'api.views.TitleViewSet.list'
+        assert record['path'].startswith('/api/v1/titles/?genre=')
+        assert record['params']
+        assert record['duration'] >= 0
+        assert record['frame'].startswith('api/'), (
+            'В записи должен быть ближайший кадр стека из кода проекта.'
+        )
+        assert 'IN (...)' in record['fingerprint']
+
+        settings.SLOW_QUERY_THRESHOLD = None
+        client.get('/api/v1/genres/')
+        assert len(path.read_text(encoding='utf-8').splitlines()) == len(
+            records
+        ), 'Без порога журнал не должен вестись.'
+
+        capsys.readouterr()
+        call_command('slow_queries', path=str(path), limit=3)
+        output = capsys.readouterr().out
+        assert output.startswith('1. ')
+        assert 'api:titles-list' in output
+        assert '4. ' not in output
+
+    def test_02_rotation_and_fingerprint(self, client, settings, tmp_path,
+                                         capsys):
+        from api.slow_queries import fingerprint, read_records
+
+        assert fingerprint(
+            "SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 5"
+        ) == fingerprint(
+            "SELECT * FROM t WHERE id IN (%s) AND name = 'y' LIMIT 10"
+        )
+        path = tmp_path / 'slow.log'
+        settings.SLOW_QUERY_LOG_PATH = str(path)
+        settings.SLOW_QUERY_LOG_MAX_BYTES = 2000
+        settings.SLOW_QUERY_LOG_BACKUP_COUNT = 100
+        settings.SLOW_QUERY_THRESHOLD = 0
+        for _ in range(10):
+            client.get('/api/v1/titles/1/reviews/')
+        assert (tmp_path / 'slow.log.1').exists(), (
+            'Журнал должен ротироваться по размеру.'
+        )
+        assert len(list(read_records(str(path)))) >= 10
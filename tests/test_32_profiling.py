@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test32Profiling:
+
+    def test_01_admin_report(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get('/api/v1/titles/?__profile=cprofile')
+        assert response.status_code == 200
+        report = response.json()
+        assert report['route'] == 'api:titles-list'
+        assert report['status'] == 200
+        assert report['functions'], (
+            'Отчёт должен содержать функции из cProfile.'
+        )
+        cumulative = [row['cumulative_ms'] for row in report['functions']]
+        assert cumulative == sorted(cumulative, reverse=True)
+        assert report['queries'] and all(
+            {'start_ms', 'duration_ms', 'sql'} <= set(query)
+            for query in report['queries']
+        )
+        fields = {
+            (row['serializer'], row['field']): row
+            for row in report['serializer_fields']
+        }
+        assert fields[('TitleSerializer', 'genre')]['calls'] > 0, (
+            'Отчёт должен содержать время сериализации по полям.'
+        )
+
+        header = admin_client.get(
+            '/api/v1/genres/', HTTP_X_PROFILE='cprofile'
+        ).json()
+        assert header['route'] == 'api:genres-list'
+
+    def test_02_not_for_users(self, admin_client, user_client, client):
+        create_titles(admin_client)
+        for api_client in (user_client, client):
+            response = api_client.get('/api/v1/titles/?__profile=cprofile')
+            assert response.status_code == 200
+            assert 'results' in response.json(), (
+                'Профилирование доступно только администратору.'
+            )
+        response = admin_client.get('/admin/?__profile=cprofile')
+        assert response['Content-Type'] != 'application/json'
+
+    def test_03_sampling(self, admin_client, client, settings, tmp_path):
+        create_titles(admin_client)
+        settings.PROFILE_DIR = str(tmp_path)
+        settings.PROFILE_SAMPLE_RATE = 1
+        response = client.get('/api/v1/titles/')
+        assert 'results' in response.json(), (
+            'Клиент должен получить обычный ответ при выборочном '
+            'профилировании.'
+        )
+        files = list(tmp_path.glob('*.json'))
+        assert len(files) == 1
+        assert 'api_titles-list' in files[0].name
+        report = json.loads(files[0].read_text(encoding='utf-8'))
+        assert report['queries'] and report['serializer_fields']
+
+        settings.PROFILE_SAMPLE_RATE = 0
+        client.get('/api/v1/titles/')
+        assert len(list(tmp_path.glob('*.json'))) == 1